@@ -1,6 +1,10 @@
 #!/usr/bin/env python3
 # Python 3.6
 
+# Import and startup times are reported by engine.precompute
+import time
+started = time.perf_counter()
+
 # Import the Halite SDK, which will let you interact with the game.
 import hlt
 
@@ -13,21 +17,49 @@ from hlt.positionals import Direction
 # This library contains ship information
 from hlt.entity import ShipStatus
 
+# Per-turn timing spans, recorded when HALITE_TIMING_DIR is set
+from hlt import timing
+
+# Compact per-turn snapshots, written by a background thread when HALITE_SNAPSHOT_DIR is set
+from hlt import snapshots
+
+# Hot path events, only formatted into the log file on error, and the last few turns' at game end
+from hlt import eventlog
+
 # Logging allows you to save messages for yourself.
 # This is required because the regular STDOUT (print statements) are reserved for the engine-bot communication.
 import logging
 
 from engine.system import calc_halite_proportion
+from engine.deadline import TurnBudget, Watchdog
+from engine import precompute
 import executors
 
+imported = time.perf_counter()
+
 """ <<<Game Begin>>> """
 
 # This game object contains the initial game state.
 game = hlt.Game(log_level=logging.WARN)
+timing.enable_from_environment(game.my_id)
+snapshots.enable_from_environment(game)
+eventlog.install()
 # At this point "game" variable is populated with initial map data.
 # This is a good place to do computationally expensive start-up pre-processing.
 logging.info(f"Game halite total amount: {game.game_map.halite_total}")
 
+# Neighbour, mining yield and move cost lookup tables, built before the turn clock starts,
+#   or memory-mapped from the startup cache of an earlier game under the same constants
+startup = precompute.precompute(game, started, imported)
+# The startup.* spans go out as the timing file's turn 0 line, the bot log is only written at WARN
+timing.flush(0)
+
+# Ship plans and the nearest dropoff field, kept across turns
+fleet = executors.hlt_alpha.FleetManager(game)
+
+# Sends a fallback command list should a turn run out of time
+watchdog = Watchdog(game)
+
 # As soon as you call "ready" function below, the 2 second per turn timer will start.
 game.ready("HonirBot")
 
@@ -42,6 +74,7 @@ while True:
     # This loop handles each turn of the game. The game object changes every turn, and you refresh that state by
     #   running update_frame().
     game.update_frame()
+    budget = TurnBudget(game.turn_started)
 
     # You extract player metadata and the updated map metadata here for convenience.
     me = game.me
@@ -53,8 +86,12 @@ while True:
         me.halite_amount
     ))
     
+    # Until a plan is ready, every ship holds position
+    watchdog.arm(budget, [ship.stay_still() for ship in me.get_ships()])
+
     # Initialise the strategy turn processor (logic engine)
-    executor = executors.hlt_alpha.TurnProcessor(game)
+    executor = executors.hlt_alpha.TurnProcessor(game, fleet)
 
     # Send your moves back to the game environment, ending this turn.
-    game.end_turn(executor.run())
+    watchdog.submit(executor.run(budget, watchdog))
+    timing.flush(game.turn_number)
@@ -0,0 +1 @@
+# Puts the bot's top-level packages (hlt, engine, executors, tools) on the path for the tests
@@ -0,0 +1,103 @@
+import logging
+import threading
+import time
+
+
+# The engine kills a bot that takes longer than this to answer a turn (seconds)
+TURN_TIME_LIMIT = 2.0
+
+# Kept in hand for parsing the frame before the budget starts, thread wake-up and writing the commands
+SAFETY_MARGIN = 0.3
+
+
+class TurnBudget:
+    """
+    The time left to plan the current turn.
+    """
+    def __init__(self, start, limit=TURN_TIME_LIMIT - SAFETY_MARGIN):
+        """
+        :param start: When the turn started, as a time.perf_counter() value
+        :param limit: How many seconds the turn may take
+        """
+        self.start = start
+        self.deadline = start + limit
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def remaining(self):
+        return self.deadline - time.perf_counter()
+
+    def expired(self):
+        return time.perf_counter() >= self.deadline
+
+
+class Watchdog:
+    """
+    Guarantees a command list reaches the engine before the turn deadline.
+
+    Arm it at the start of each turn with a safe fallback (e.g. every ship
+    staying still), keep it updated with the best plan found so far, and
+    submit the final plan. If the deadline passes first, a background thread
+    sends the latest plan through Game.end_turn and the late submission is
+    dropped.
+    """
+    def __init__(self, game):
+        self.game = game
+        self._condition = threading.Condition()
+        self._deadline = None
+        self._commands = None
+        self._sent = True
+
+        watcher = threading.Thread(target=self._watch, name="turn-watchdog", daemon=True)
+        watcher.start()
+
+    def arm(self, budget, fallback):
+        """
+        Start watching a new turn.
+        :param budget: The TurnBudget for this turn
+        :param fallback: The commands to send if nothing better arrives in time
+        """
+        with self._condition:
+            self._deadline = budget.deadline
+            self._commands = list(fallback)
+            self._sent = False
+            self._condition.notify()
+
+    def update(self, commands):
+        """
+        Replace the commands sent on timeout with a better plan.
+        """
+        with self._condition:
+            if not self._sent:
+                self._commands = list(commands)
+
+    def submit(self, commands):
+        """
+        Send the final commands for this turn, unless the watchdog already sent the fallback.
+        :return: True if these commands were sent
+        """
+        with self._condition:
+            if self._sent:
+                logging.warning(f"Turn {self.game.turn_number} plan dropped, watchdog already ended the turn")
+                return False
+            self._sent = True
+            self._condition.notify()
+        self.game.end_turn(commands)
+        return True
+
+    def _watch(self):
+        with self._condition:
+            while True:
+                if self._sent:
+                    self._condition.wait()
+                    continue
+
+                remaining = self._deadline - time.perf_counter()
+                if remaining > 0:
+                    self._condition.wait(remaining)
+                    continue
+
+                self._sent = True
+                logging.warning(f"Turn {self.game.turn_number} deadline reached, sending fallback commands")
+                self.game.end_turn(self._commands)
@@ -0,0 +1,97 @@
+import logging
+from array import array
+from collections import deque
+
+from hlt.positionals import Direction, Position
+from hlt.torus import EAST, NEIGHBOURS, NORTH, OPPOSITE, SOUTH, STILL, WEST
+
+
+# Direction codes stored in the field, indexed by the value in DropoffField.direction: columns of Torus.neighbours
+MOVES = (Direction.North, Direction.South, Direction.East, Direction.West, Direction.Still)
+
+# The order the search expands a cell's neighbours in, which settles ties between equally near dropoffs
+_EXPANSION = (EAST, WEST, SOUTH, NORTH)
+
+
+class DropoffField:
+    """
+    Distance to, and next step towards, the nearest dropoff for every cell on the map.
+
+    Built with a single multi-source breadth first search from all dropoffs
+    (including the shipyard), and only rebuilt when the set of dropoffs changes.
+    All arrays are indexed by flat cell index.
+    """
+    def __init__(self, torus):
+        self.torus = torus
+        self.sources = ()
+        self.distance = array('i', [0]) * torus.size
+        self.direction = array('b', [STILL]) * torus.size
+        self.nearest = array('i', [0]) * torus.size
+
+    def update(self, sources):
+        """
+        Rebuild the field if the dropoffs have changed since the last update.
+        :param sources: Flat indices of every dropoff, in priority order
+        :return: True if the field was rebuilt
+        """
+        sources = tuple(sources)
+        if sources == self.sources:
+            return False
+
+        self.sources = sources
+        self._build()
+        logging.debug(f"Dropoff field rebuilt for {len(sources)} dropoffs")
+        return True
+
+    def _build(self):
+        torus = self.torus
+        moves = torus.moves
+        distance = array('i', [-1]) * torus.size
+        direction = array('b', [STILL]) * torus.size
+        nearest = array('i', [-1]) * torus.size
+
+        frontier = deque()
+        for source in self.sources:
+            if distance[source] < 0:
+                distance[source] = 0
+                nearest[source] = source
+                frontier.append(source)
+
+        # Each neighbour to expand, with the move from it back onto the cell
+        expansion = tuple((slot, OPPOSITE[slot]) for slot in _EXPANSION)
+
+        while frontier:
+            index = frontier.popleft()
+            neighbours = moves[index]
+            next_distance = distance[index] + 1
+            source = nearest[index]
+            for slot, back in expansion:
+                neighbour = neighbours[slot]
+                if distance[neighbour] < 0:
+                    distance[neighbour] = next_distance
+                    direction[neighbour] = back
+                    nearest[neighbour] = source
+                    frontier.append(neighbour)
+
+        self.distance = distance
+        self.direction = direction
+        self.nearest = nearest
+
+    def next_move(self, index):
+        """
+        :return: The Direction one step closer to the nearest dropoff from a cell
+        """
+        return MOVES[self.direction[index]]
+
+    def next_index(self, index):
+        """
+        :return: The flat index of the cell one step closer to the nearest dropoff from a cell
+        """
+        return self.torus.neighbours[NEIGHBOURS * index + self.direction[index]]
+
+    def nearest_position(self, index):
+        """
+        :return: The Position of the nearest dropoff from a cell
+        """
+        nearest = self.nearest[index]
+        return Position(self.torus.xs[nearest], self.torus.ys[nearest])
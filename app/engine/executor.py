@@ -1,6 +1,8 @@
 import logging
 import random
 
+from hlt import eventlog
+from hlt.entity import describe_move
 from hlt.positionals import Direction
 
 
@@ -19,13 +21,15 @@ class CommandExecutor:
 
     def move_randomly(self, ship):
         direction = random.choice([ Direction.North, Direction.South, Direction.East, Direction.West ])
-        logging.info(f"Move Random: {ship.id}, {ship.position} -> {ship.position.directional_offset(direction)}, {ship.status}, {Direction.convert(direction)}")
+        eventlog.record(describe_move, "Move Random", ship.id, ship.position, direction, ship.status,
+                        Direction.convert(direction))
         self.add_command(ship.move(direction))
 
     def move_direction(self, ship, direction):
-        logging.info(f"Move Direction: {ship.id}, {ship.position} -> {ship.position.directional_offset(direction)}, {ship.status}, {Direction.convert(direction)}")
+        eventlog.record(describe_move, "Move Direction", ship.id, ship.position, direction, ship.status,
+                        Direction.convert(direction))
         self.add_command(ship.move(direction))
 
     def hold_position(self, ship):
-        logging.info(f"Hold Position: {ship.id}, {ship.position}, {ship.status}")
+        eventlog.record("Hold Position: {}, {}, {}", ship.id, ship.position, ship.status)
         self.add_command(ship.stay_still())
@@ -0,0 +1,99 @@
+import logging
+import operator
+from array import array
+
+from hlt import constants, timing
+
+
+class InspirationMap:
+    """
+    How many ships of each player are within the inspiration radius of every cell.
+
+    Rebuilt every turn by stamping a Manhattan diamond around each live ship
+    onto its owner's count array, so the work is ships * diamond cells
+    rather than cells * diamond cells. The enemies of a player near a cell
+    are then every ship near it less the player's own. Arrays are indexed
+    by flat cell index.
+    """
+    def __init__(self, torus):
+        self.torus = torus
+        self.enabled = constants.INSPIRATION_ENABLED
+        self.radius = constants.INSPIRATION_RADIUS
+        self.threshold = constants.INSPIRATION_SHIP_COUNT
+        self._offsets = [(dx, dy) for dy in range(-self.radius, self.radius + 1)
+                         for dx in range(-self.radius + abs(dy), self.radius - abs(dy) + 1)]
+        self._diamonds = {}
+
+        self.total = array('i', [0]) * torus.size
+        self.counts = {}
+        self._inspired = {}
+
+    def _diamond(self, index):
+        # The cells within the radius of a cell, built the first time a ship is seen there
+        diamond = self._diamonds.get(index)
+        if diamond is None:
+            torus = self.torus
+            x = torus.xs[index]
+            y = torus.ys[index]
+            diamond = tuple(torus.index(x + dx, y + dy) for dx, dy in self._offsets)
+            self._diamonds[index] = diamond
+        return diamond
+
+    @timing.timed("InspirationMap.update")
+    def update(self, store):
+        """
+        Recount from every live ship in the game.
+        :param store: The game's EntityStore
+        """
+        size = self.torus.size
+        total = array('i', [0]) * size
+        counts = {}
+        self._inspired = {}
+        if self.enabled:
+            index = self.torus.index
+            xs = store.xs
+            ys = store.ys
+            owners = store.owners
+            for slot in store.live_slots():
+                player_counts = counts.get(owners[slot])
+                if player_counts is None:
+                    player_counts = counts[owners[slot]] = array('i', [0]) * size
+                for cell in self._diamond(index(xs[slot], ys[slot])):
+                    player_counts[cell] += 1
+                    total[cell] += 1
+        self.total = total
+        self.counts = counts
+        logging.debug(f"Inspiration counted for {len(store)} ships")
+
+    def enemies(self, player_id, index):
+        """
+        :return: How many ships not owned by the player are within the inspiration radius of a cell
+        """
+        own = self.counts.get(player_id)
+        return self.total[index] - (own[index] if own is not None else 0)
+
+    def enemy_counts(self, player_id):
+        """
+        :return: An array, by flat cell index, of how many ships not owned by the player are within the radius
+        """
+        own = self.counts.get(player_id)
+        if own is None:
+            return self.total
+        return array('i', map(operator.sub, self.total, own))
+
+    def inspired(self, player_id):
+        """
+        :return: An array, by flat cell index, of 1 where a ship of the player would be inspired, else 0
+        """
+        inspired = self._inspired.get(player_id)
+        if inspired is None:
+            own = self.counts.get(player_id)
+            threshold = self.threshold
+            if max(self.total) < threshold:
+                inspired = array('b', bytes(self.torus.size))
+            elif own is None:
+                inspired = array('b', [count >= threshold for count in self.total])
+            else:
+                inspired = array('b', [count - mine >= threshold for count, mine in zip(self.total, own)])
+            self._inspired[player_id] = inspired
+        return inspired
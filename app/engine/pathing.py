@@ -0,0 +1,155 @@
+import heapq
+import logging
+from array import array
+
+from hlt import timing
+
+from engine.system import YieldTables
+
+
+class CostField:
+    """
+    The cheapest halite cost of travelling from a source cell to every cell within a Manhattan radius.
+
+    Moving off a cell costs that cell's move cost, so the cost of a trip is
+    the sum of the move costs of every cell left on the way, the target
+    excluded. Among equally cheap routes the one with fewest moves wins.
+    cost, steps and parent are dicts keyed by flat cell index, holding only
+    the cells within radius of the source.
+    """
+    __slots__ = ('source', 'radius', 'cost', 'steps', 'parent')
+
+    def __init__(self, source, radius, cost, steps, parent):
+        self.source = source
+        self.radius = radius
+        self.cost = cost
+        self.steps = steps
+        self.parent = parent
+
+    def path_to(self, target):
+        """
+        :param target: A flat cell index within radius of the source
+        :return: The flat indices along the cheapest route, excluding the source, or None if out of range
+        """
+        if target not in self.parent:
+            return None
+        path = []
+        parent = self.parent
+        while target != self.source:
+            path.append(target)
+            target = parent[target]
+        path.reverse()
+        return path
+
+
+class PathPlanner:
+    """
+    Dijkstra searches on the torus weighted by move cost, cached across turns.
+
+    A cost field stays cached until the move cost of a cell it covers changes
+    (found from the board's changed cells), or it goes a turn without being
+    asked for. Searches are bounded to a Manhattan radius around the source,
+    which keeps each one to a few hundred cells at sweep sized radii.
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.torus = game_map.torus
+        # (North, South, East, West, Still) of every cell, staying put never beats the route there
+        self.neighbours = self.torus.moves
+
+        tables = YieldTables.get()
+        self.move_costs = array('i', map(tables.move_cost, game_map.halite))
+        self._fields = {}
+        self._used = set()
+
+    @timing.timed("PathPlanner.update")
+    def update(self):
+        """
+        Catch up with this turn's board, dropping cost fields covering a cell whose move cost changed,
+        and fields nobody asked for last turn.
+        """
+        tables = YieldTables.get()
+        halite = self.game_map.halite
+        move_costs = self.move_costs
+        dirty = []
+        for index in self.game_map.changed_cells:
+            move_cost = tables.move_cost(halite[index])
+            if move_cost != move_costs[index]:
+                move_costs[index] = move_cost
+                dirty.append(index)
+
+        fields = {}
+        for key, field in self._fields.items():
+            if key in self._used and not any(index in field.cost for index in dirty):
+                fields[key] = field
+        logging.debug(f"Path planner kept {len(fields)} of {len(self._fields)} cost fields, "
+                      f"{len(dirty)} cells changed cost")
+        self._fields = fields
+        self._used = set()
+
+    def field(self, source, radius):
+        """
+        :param source: The flat index to search from
+        :param radius: How far, in Manhattan distance, the search may go
+        :return: The CostField, from the cache if still valid
+        """
+        key = (source, radius)
+        self._used.add(key)
+        field = self._fields.get(key)
+        if field is None:
+            field = self._search(source, radius)
+            self._fields[key] = field
+        return field
+
+    def fields(self, sources, radius):
+        """
+        Cost fields for many ships at once, searching from each distinct source only once.
+        :param sources: An iterable of flat indices
+        :param radius: How far each search may go
+        :return: A dict of source index -> CostField
+        """
+        return {source: self.field(source, radius) for source in set(sources)}
+
+    def trip_cost(self, source, target, radius):
+        """
+        :return: The halite cost of the cheapest route from source to target, or None if beyond radius
+        """
+        return self.field(source, radius).cost.get(target)
+
+    @timing.timed("PathPlanner._search")
+    def _search(self, source, radius):
+        torus = self.torus
+        xs = torus.xs
+        ys = torus.ys
+        x_distance = torus.x_distance
+        y_distance = torus.y_distance
+        source_x = xs[source]
+        source_y = ys[source]
+        neighbours = self.neighbours
+        move_costs = self.move_costs
+        push = heapq.heappush
+        pop = heapq.heappop
+
+        cost = {source: 0}
+        steps = {source: 0}
+        parent = {source: source}
+        frontier = [(0, 0, source)]
+        while frontier:
+            index_cost, index_steps, index = pop(frontier)
+            if index_cost != cost[index] or index_steps != steps[index]:
+                continue
+            next_cost = index_cost + move_costs[index]
+            next_steps = index_steps + 1
+            for neighbour in neighbours[index]:
+                known = cost.get(neighbour)
+                if known is None:
+                    if x_distance[abs(xs[neighbour] - source_x)] + y_distance[abs(ys[neighbour] - source_y)] > radius:
+                        continue
+                elif known < next_cost or (known == next_cost and steps[neighbour] <= next_steps):
+                    continue
+                cost[neighbour] = next_cost
+                steps[neighbour] = next_steps
+                parent[neighbour] = index
+                push(frontier, (next_cost, next_steps, neighbour))
+
+        return CostField(source, radius, cost, steps, parent)
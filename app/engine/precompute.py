@@ -0,0 +1,175 @@
+"""
+Startup precomputation, run in the time before game.ready().
+
+Builds the lookup tables the turn loop needs that depend only on the game
+constants: the mining yield and move cost tables. They are cached on
+disk, one file per constants hash shared by every map size, so later games
+memory-map the file and copy the tables straight out of it instead of
+building them again (arrays index faster than int32 memoryviews of the
+map would, and copying takes a millisecond or two).
+
+The Torus distance, direction and neighbour tables are built while the
+Game reads the map, and its interned Positions are Python objects, so
+neither is cached.
+
+Cache file layout: MAGIC, VERSION and the number of tables, then per table
+its name (24 bytes) and the byte offset and item count of its int32 data.
+Files are written to a temporary name and renamed into place, so bots
+starting together never read a partial file.
+
+Cache directory: HALITE_CACHE_DIR, or halite-cache in the temp directory.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+from collections import namedtuple
+
+from hlt import constants, timing
+
+from engine.system import YIELD_HORIZON, YieldTables
+
+
+# Directory to keep the cache files in
+CACHE_VARIABLE = "HALITE_CACHE_DIR"
+
+MAGIC = b'HLTC'
+VERSION = 2
+
+_HEADER = struct.Struct('<4sii')
+_ENTRY = struct.Struct('<24sqq')
+
+"""Startup timings in seconds: cached is whether the tables were loaded from path rather than built."""
+StartupReport = namedtuple('StartupReport', ['path', 'cached', 'imports', 'game', 'precompute'])
+
+
+def constants_hash():
+    """
+    :return: A short hash of the loaded game constants the tables depend on, and the cache format
+    """
+    return hashlib.sha1(repr((VERSION,) + YieldTables.key()).encode()).hexdigest()[:16]
+
+
+def cache_path(directory=None):
+    """
+    :return: The cache file for the loaded game constants
+    """
+    if directory is None:
+        directory = os.environ.get(CACHE_VARIABLE) or os.path.join(tempfile.gettempdir(), "halite-cache")
+    return os.path.join(directory, "tables-{}.bin".format(constants_hash()))
+
+
+def write_tables(path, tables):
+    """
+    Write int32 tables to a cache file.
+    :param path: The file to write
+    :param tables: A dict of name -> array of ints
+    """
+    offset = _HEADER.size + _ENTRY.size * len(tables)
+    entries = []
+    data = []
+    for name, table in tables.items():
+        table = array('i', table)
+        if sys.byteorder != 'little':
+            table.byteswap()
+        if len(name) > _ENTRY.size - 16:
+            raise ValueError(f"Table name {name} too long")
+        entries.append(_ENTRY.pack(name.encode(), offset, len(table)))
+        data.append(table.tobytes())
+        offset += 4 * len(table)
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "wb") as cache_file:
+        cache_file.write(_HEADER.pack(MAGIC, VERSION, len(tables)))
+        cache_file.write(b''.join(entries))
+        cache_file.write(b''.join(data))
+    os.replace(temporary, path)
+
+
+def read_tables(path):
+    """
+    Memory-map a cache file.
+    :param path: The file to read
+    :return: A dict of name -> int32 memoryview into the file, or None if it is missing or unreadable
+    """
+    if sys.byteorder != 'little':
+        return None
+    try:
+        with open(path, "rb") as cache_file:
+            data = mmap.mmap(cache_file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, num_tables = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        view = memoryview(data)
+        tables = {}
+        for entry in range(num_tables):
+            name, offset, count = _ENTRY.unpack_from(data, _HEADER.size + entry * _ENTRY.size)
+            if offset % 4 or offset + 4 * count > len(data):
+                return None
+            tables[name.rstrip(b'\0').decode()] = view[offset:offset + 4 * count].cast('i')
+        return tables
+    except (struct.error, UnicodeDecodeError):
+        return None
+
+
+def _copy(view):
+    table = array('i')
+    table.frombytes(view.cast('B'))
+    return table
+
+
+def _valid(tables):
+    # Every table present and of the size the constants call for
+    stride = 2 * constants.MAX_HALITE + 1
+    sizes = dict.fromkeys(YieldTables.TABLES, stride * (YIELD_HORIZON + 1))
+    sizes.update(move_costs=stride, inspired_move_costs=stride)
+    return tables is not None and all(len(tables.get(name, ())) == size for name, size in sizes.items())
+
+
+def _precompute(path):
+    tables = read_tables(path)
+    if _valid(tables):
+        YieldTables.get({name: _copy(table) for name, table in tables.items()})
+        return True
+
+    yield_tables = YieldTables.get()
+    tables = {name: getattr(yield_tables, name) for name in YieldTables.TABLES}
+    try:
+        write_tables(path, tables)
+    except OSError as error:
+        logging.debug(f"Startup cache {path} not written: {error!r}")
+    return False
+
+
+def precompute(game, started=None, imported=None):
+    """
+    Build or load every startup table for the game's constants.
+    :param game: The Game, once its initial state is read
+    :param started: perf_counter() when the bot started importing, to report import and game setup times
+    :param imported: perf_counter() when the imports were done
+    :return: A StartupReport
+    """
+    start = time.perf_counter()
+    path = cache_path()
+    cached = _precompute(path)
+    finished = time.perf_counter()
+
+    report = StartupReport(path, cached,
+                           imported - started if started is not None and imported is not None else None,
+                           start - imported if imported is not None else None,
+                           finished - start)
+    for name in ('imports', 'game', 'precompute'):
+        if getattr(report, name) is not None:
+            timing.record("startup." + name, getattr(report, name))
+    logging.debug(f"Startup: {report}")
+    return report
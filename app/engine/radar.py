@@ -1,64 +1,61 @@
-import logging
 from collections import namedtuple
 
-from hlt import constants
-from hlt.positionals import Position
+from hlt import timing
 
-from engine.system import calc_move_cost
+from engine.system import YieldTables
 
 
 HaliteCell = namedtuple('HaliteCell', ['position', 'halite_amount', 'distance', 'move_cost'])
 
-EnemyCell = namedtuple('EnemyCell', ['position', 'id', 'halite_amount'])
+# A square window of the board around an origin, as parallel columns. Every column
+# is a list with one entry per cell, in row-major order from the top left: indices
+# are flat cell indices, and ship_id, ship_owner and structure_owner are -1 where
+# the cell is empty. centre is the column entry of the origin cell.
+SweepWindow = namedtuple('SweepWindow', ['origin', 'radius', 'centre', 'indices', 'halite', 'distance',
+                                         'move_cost', 'ship_id', 'ship_owner', 'structure_owner'])
+
+# Distance column per radius, the same for every origin
+_window_distances = {}
+
+
+def _distances(radius):
+    if radius not in _window_distances:
+        sweep_range = range(-radius, radius + 1)
+        _window_distances[radius] = [abs(x) + abs(y) for y in sweep_range for x in sweep_range]
+    return _window_distances[radius]
+
+
+@timing.timed("radar.scan")
+def scan(game_map, origin, radius=1):
+    """
+    Cuts the square window of the given radius around origin out of the board arrays.
+
+    The radius is capped so the window never wraps onto itself.
+    :param game_map: The game map
+    :param origin: The position at the centre of the window
+    :param radius: How many cells to look in each direction
+    :return: A SweepWindow
+    """
+    width = game_map.width
+    height = game_map.height
+    radius = min(radius, (width - 1) // 2, (height - 1) // 2)
+
+    sweep_range = range(-radius, radius + 1)
+    columns = [(origin.x + x) % width for x in sweep_range]
+    rows = [((origin.y + y) % height) * width for y in sweep_range]
+    indices = [row + column for row in rows for column in columns]
+
+    halite = list(map(game_map.halite.__getitem__, indices))
+    return SweepWindow(
+        origin,
+        radius,
+        len(indices) // 2,
+        indices,
+        halite,
+        _distances(radius),
+        list(map(YieldTables.get().move_cost, halite)),
+        list(map(game_map.ship_ids.__getitem__, indices)),
+        list(map(game_map.ship_owners.__getitem__, indices)),
+        list(map(game_map.structure_owners.__getitem__, indices)),
+    )
 
-FriendlyCell = namedtuple('FriendlyCell', ['position', 'id'])
-
-StructureCell = namedtuple('StructureCell', ['position', 'structure_type'])
-
-
-def radar_sweep(player_id, game_map, origin, sweep_distance=1):
-    sweep = {
-        'origin': None,
-        'halite': [],
-        'targets': [],
-        'friendlies': [],
-        'structures': []
-    }
-
-    sweep_range = range(-sweep_distance, sweep_distance+1)
-    for y in sweep_range:
-        for x in sweep_range:
-            if x == 0 and y == 0:
-                map_cell = game_map[origin]
-            else:
-                norm_x = (origin.x + x) % constants.WIDTH
-                norm_y = (origin.y + y) % constants.HEIGHT
-                map_cell = game_map[origin + Position(x, y, normalize=False)]
-
-            distance = abs(x) + abs(y)  # how many cells will we have to move?
-
-            if (x == 0 and y == 0):
-                # origin map cell
-                move_cost = calc_move_cost(map_cell.halite_amount)
-                cell = HaliteCell(map_cell.position, map_cell.halite_amount, distance, move_cost)
-                sweep['origin'] = cell
-                sweep['halite'].append(cell)
-            elif map_cell.is_empty:
-                # halite map cell
-                move_cost = calc_move_cost(map_cell.halite_amount)
-                sweep['halite'].append(HaliteCell(map_cell.position, map_cell.halite_amount, distance, move_cost))
-            elif map_cell.is_occupied:
-                if map_cell.ship.owner != player_id:
-                    # contains an enemy ship, so add ship cargo to location halite
-                    target_halite = map_cell.halite_amount + map_cell.ship.halite_amount
-                    sweep['targets'].append(EnemyCell(map_cell.position, map_cell.ship.id, target_halite))
-                else:
-                    # contains a friendly ship
-                    sweep['friendlies'].append(FriendlyCell(map_cell.position, map_cell.ship.id))
-            elif map_cell.has_structure:
-                # contains a dropoff or shipyard
-                sweep['structures'].append(StructureCell(map_cell.position, map_cell.structure_type))
-            else:
-                logging.warning(f"Radar sweep ran out of options for {map_cell}")
-
-    return sweep
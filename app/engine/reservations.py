@@ -0,0 +1,170 @@
+import heapq
+from collections import deque
+from types import MappingProxyType
+
+from hlt import timing
+
+
+# How many turns ahead ships reserve cells and the cooperative search looks
+WINDOW = 8
+
+
+class ReservationTable:
+    """
+    Which friendly ship will be in which cell on which turn, kept across turns.
+
+    Maps (cell index, turn) -> ship id, with each ship's reservations also
+    kept in turn order so releasing a ship, and dropping turns that have
+    passed, only touch that ship's entries. Only vertex conflicts count:
+    ships swapping cells in the engine pass through each other.
+
+    holders is a read-only, live view of the (cell index, turn) -> ship id
+    map, for searches that test many cells.
+    """
+    def __init__(self):
+        self._cells = {}
+        self._ships = {}
+        self.holders = MappingProxyType(self._cells)
+
+    def __len__(self):
+        return len(self._cells)
+
+    def holder(self, cell, turn):
+        """
+        :return: The id of the ship holding a cell on a turn, or None
+        """
+        return self._cells.get((cell, turn))
+
+    def conflicts(self, ship_id, cells, start_turn):
+        """
+        :param cells: The cells a ship would be in, from start_turn on
+        :return: True if another ship holds any of them
+        """
+        reserved = self._cells
+        for turn, cell in enumerate(cells, start_turn):
+            holder = reserved.get((cell, turn))
+            if holder is not None and holder != ship_id:
+                return True
+        return False
+
+    def reserve(self, ship_id, cells, start_turn):
+        """
+        Replace a ship's reservations. Cells already held by another ship are skipped.
+        :param cells: The cells the ship will be in, from start_turn on
+        """
+        self.release(ship_id)
+        reserved = self._cells
+        keys = deque()
+        for turn, cell in enumerate(cells, start_turn):
+            key = (cell, turn)
+            if key not in reserved:
+                reserved[key] = ship_id
+                keys.append(key)
+        self._ships[ship_id] = keys
+
+    def release(self, ship_id):
+        """
+        Drop every reservation a ship holds, e.g. when it is destroyed or re-plans.
+        """
+        keys = self._ships.pop(ship_id, None)
+        if keys:
+            reserved = self._cells
+            for key in keys:
+                if reserved.get(key) == ship_id:
+                    del reserved[key]
+
+    def extend(self, ship_id, cells, start_turn):
+        """
+        Add reservations for the turns after the last one a ship holds, leaving the rest as they are.
+        :param cells: The cells the ship will be in, from start_turn on
+        """
+        keys = self._ships.get(ship_id)
+        if not keys:
+            self.reserve(ship_id, cells, start_turn)
+            return
+        reserved = self._cells
+        last = keys[-1][1]
+        for turn, cell in enumerate(cells, start_turn):
+            key = (cell, turn)
+            if turn > last and key not in reserved:
+                reserved[key] = ship_id
+                keys.append(key)
+
+    @timing.timed("ReservationTable.advance")
+    def advance(self, turn):
+        """
+        Forget reservations for turns before this one.
+        """
+        reserved = self._cells
+        for keys in self._ships.values():
+            while keys and keys[0][1] < turn:
+                key = keys.popleft()
+                del reserved[key]
+
+
+@timing.timed("reservations.cooperative_path")
+def cooperative_path(table, planner, ship_id, start, target, start_turn, window=WINDOW):
+    """
+    Space-time A* for one ship, avoiding the cells other ships have reserved.
+
+    Each step either moves to a neighbour or waits, and takes a turn. The
+    search looks window turns ahead: it stops on reaching the target or on
+    reaching the window's last turn, whichever is closest to the target by
+    turns taken plus Manhattan distance left. Among equally quick routes the
+    one costing least halite to move along wins.
+
+    :param table: The ReservationTable
+    :param planner: The PathPlanner, for the torus and move cost tables
+    :param ship_id: The ship planning, whose own reservations don't block it
+    :param start: The ship's flat cell index on start_turn
+    :param target: The flat cell index to head for
+    :param start_turn: The current turn
+    :param window: How many turns to plan
+    :return: The flat indices the ship is in on each following turn, ending on the target if reached
+    """
+    torus = planner.torus
+    xs = torus.xs
+    ys = torus.ys
+    x_distance = torus.x_distance
+    y_distance = torus.y_distance
+    target_x = xs[target]
+    target_y = ys[target]
+    neighbours = planner.neighbours
+    move_costs = planner.move_costs
+    reserved = table.holders
+    push = heapq.heappush
+    pop = heapq.heappop
+
+    # Nodes are (cell, parent node), ties on the heap broken by push order
+    pushed = 0
+    frontier = [(x_distance[abs(xs[start] - target_x)] + y_distance[abs(ys[start] - target_y)], 0, 0, pushed,
+                 (start, None))]
+    closed = set()
+    while frontier:
+        estimate, steps, cost, _, node = pop(frontier)
+        cell = node[0]
+        if (cell, steps) in closed:
+            continue
+        closed.add((cell, steps))
+        if cell == target or steps == window:
+            path = []
+            while node[1] is not None:
+                path.append(node[0])
+                node = node[1]
+            path.reverse()
+            return path
+
+        turn = start_turn + steps + 1
+        next_steps = steps + 1
+        leave_cost = cost + move_costs[cell]
+        for neighbour in neighbours[cell]:
+            if (neighbour, next_steps) in closed:
+                continue
+            holder = reserved.get((neighbour, turn))
+            if holder is not None and holder != ship_id:
+                continue
+            pushed += 1
+            distance = x_distance[abs(xs[neighbour] - target_x)] + y_distance[abs(ys[neighbour] - target_y)]
+            push(frontier, (next_steps + distance, next_steps, cost if neighbour == cell else leave_cost, pushed,
+                            (neighbour, node)))
+    return []
@@ -0,0 +1,74 @@
+import logging
+from collections import namedtuple
+
+from hlt import timing
+from hlt.positionals import Direction
+
+
+"""The outcome of resolving the fleet's moves: moves is a list of (ship, direction), claimed maps cell index -> ship."""
+Resolution = namedtuple('Resolution', ['moves', 'claimed'])
+
+
+@timing.timed("resolver.resolve_moves")
+def resolve_moves(requests, blocked=()):
+    """
+    Assigns every ship a move so that no two friendly ships end up in the same cell.
+
+    Each ship ranks the moves it would like to make. The fleet is solved as one
+    bipartite matching between ships and destination cells, using augmenting
+    paths (Kuhn's algorithm): a ship first takes its best free cell, and only
+    when all of its cells are taken does it try to push the current holders
+    onto their other choices. Staying still is always a ship's last resort, so
+    a complete assignment always exists. Swaps between friendly ships fall out
+    naturally, since a ship's current cell is only reserved if it stays.
+
+    :param requests: A list of (ship, directions) in priority order, directions ranked best first
+    :param blocked: Cell indices no ship may move into, e.g. enemy ships. Staying still is always allowed.
+    :return: A Resolution
+    """
+    options = []
+    for ship, directions in requests:
+        position = ship.position
+        ranked = []
+        seen = set()
+        for direction in directions:
+            cell = position.directional_offset(direction).index
+            if cell not in seen and (cell == position.index or cell not in blocked):
+                seen.add(cell)
+                ranked.append((cell, direction))
+        if position.index not in seen:
+            ranked.append((position.index, Direction.Still))
+        options.append(ranked)
+
+    # Ships that can only stay where they are go first, everyone else keeps their priority
+    order = sorted(range(len(requests)), key=lambda entry: len(options[entry]) > 1)
+
+    claimed = {}
+    assigned = [None] * len(requests)
+
+    def augment(entry, visited):
+        for cell, direction in options[entry]:
+            if cell in visited:
+                continue
+            visited.add(cell)
+            holder = claimed.get(cell)
+            if holder is None or augment(holder, visited):
+                claimed[cell] = entry
+                assigned[entry] = direction
+                return True
+        return False
+
+    for entry in order:
+        for cell, direction in options[entry]:
+            if cell not in claimed:
+                claimed[cell] = entry
+                assigned[entry] = direction
+                break
+        else:
+            if not augment(entry, set()):
+                # Can't happen while every ship may stay still, but never drop a ship's command
+                logging.warning(f"No collision free move for {requests[entry][0]}")
+                assigned[entry] = Direction.Still
+
+    moves = [(ship, direction) for (ship, _), direction in zip(requests, assigned)]
+    return Resolution(moves, {cell: requests[entry][0] for cell, entry in claimed.items()})
@@ -0,0 +1,132 @@
+import logging
+import operator
+from array import array
+from itertools import accumulate, chain
+
+from hlt import timing
+
+
+# Half widths of the square windows halite density is measured over
+SITE_RADII = (2, 4, 8)
+
+# A new dropoff must be at least this far from our existing ones to be worth building, and no further than this
+MIN_DROPOFF_DISTANCE = 8
+MAX_DROPOFF_DISTANCE = 20
+
+# Score lost per enemy ship within the inspiration radius of a site
+ENEMY_PENALTY = 25
+
+
+class SiteScorer:
+    """
+    Scores every cell of the map as a site for a new dropoff.
+
+    A site's score is the mean halite per cell in a square window around it,
+    summed over SITE_RADII, less a penalty per nearby enemy ship. Sites too
+    close to, or too far from, our existing dropoffs score 0.
+
+    The window sums wrap around the torus and are kept as one array per
+    radius. They are brought up to date only when scores are asked for:
+    track() notes each turn's changed cells, and the next scoring rebuilds
+    the sums with cyclic prefix sums (a summed-area table, one axis at a
+    time) when much of the board changed, and otherwise adds each changed
+    cell's difference to the windows containing it.
+    """
+    def __init__(self, game_map):
+        self.game_map = game_map
+        self.torus = game_map.torus
+        width = self.torus.width
+        height = self.torus.height
+        # A window may not wrap onto itself
+        self.radii = tuple(min(radius, (width - 1) // 2, (height - 1) // 2) for radius in SITE_RADII)
+        self.areas = tuple((2 * radius + 1) ** 2 for radius in self.radii)
+
+        self.halite = array('i', game_map.halite)
+        self.pending = set()
+        self.sums = [self._window_sums(radius) for radius in self.radii]
+
+    def _window_sums(self, radius):
+        # Cyclic window sums along each row, then along each column of those
+        width = self.torus.width
+        height = self.torus.height
+        span = 2 * radius + 1
+        halite = self.halite
+        rows = array('i', [0]) * self.torus.size
+        for start in range(0, self.torus.size, width):
+            row = halite[start:start + width]
+            prefix = list(accumulate(chain((0,), row[width - radius:], row, row[:radius])))
+            rows[start:start + width] = array('i', map(operator.sub, prefix[span:], prefix[:width]))
+
+        sums = array('i', [0]) * self.torus.size
+        for x in range(width):
+            column = rows[x::width]
+            prefix = list(accumulate(chain((0,), column[height - radius:], column, column[:radius])))
+            sums[x::width] = array('i', map(operator.sub, prefix[span:], prefix[:height]))
+        return sums
+
+    def _add(self, sums, radius, index, delta):
+        torus = self.torus
+        width = torus.width
+        x = torus.xs[index]
+        y = torus.ys[index]
+        columns = [(x + dx) % width for dx in range(-radius, radius + 1)]
+        for dy in range(-radius, radius + 1):
+            row = ((y + dy) % torus.height) * width
+            for column in columns:
+                sums[row + column] += delta
+
+    def track(self):
+        """
+        Note this turn's changed cells, for the window sums to catch up with on the next scoring.
+        """
+        self.pending.update(self.game_map.changed_cells)
+
+    @timing.timed("SiteScorer.update")
+    def update(self):
+        """
+        Catch up with the board's cells changed since the last update.
+        """
+        halite = self.game_map.halite
+        changes = []
+        for index in self.pending:
+            delta = halite[index] - self.halite[index]
+            if delta:
+                changes.append((index, delta))
+                self.halite[index] = halite[index]
+        self.pending.clear()
+
+        for entry, (radius, area) in enumerate(zip(self.radii, self.areas)):
+            if len(changes) * area > self.torus.size:
+                self.sums[entry] = self._window_sums(radius)
+            else:
+                for index, delta in changes:
+                    self._add(self.sums[entry], radius, index, delta)
+
+    @timing.timed("SiteScorer.scores")
+    def scores(self, dropoff_field, enemies=None):
+        """
+        Score every cell as a dropoff site.
+        :param dropoff_field: The DropoffField of our existing dropoffs and shipyard
+        :param enemies: Enemy ships within the inspiration radius of every cell, or None to ignore enemies
+        :return: A list of scores by flat cell index, 0 where a dropoff shouldn't go
+        """
+        self.update()
+        density = [0] * self.torus.size
+        for sums, area in zip(self.sums, self.areas):
+            density = [total + window // area for total, window in zip(density, sums)]
+        if enemies is not None:
+            density = [total - ENEMY_PENALTY * count for total, count in zip(density, enemies)]
+
+        return [max(score, 0) if MIN_DROPOFF_DISTANCE <= distance <= MAX_DROPOFF_DISTANCE else 0
+                for score, distance in zip(density, dropoff_field.distance)]
+
+    def best(self, dropoff_field, enemies=None):
+        """
+        :return: The (score, Position) of the best dropoff site, or None if no site scores
+        """
+        scores = self.scores(dropoff_field, enemies)
+        index = max(range(len(scores)), key=scores.__getitem__)
+        if not scores[index]:
+            return None
+        logging.debug(f"Best dropoff site {self.torus.positions[index]} scores {scores[index]}")
+        return scores[index], self.torus.positions[index]
@@ -1,17 +1,148 @@
 import logging
-import math
+from array import array
 
 from hlt import constants
 
 
+# How many turns of mining the yield tables cover
+YIELD_HORIZON = 32
+
+
 def calc_halite_proportion(total, collected):
     return round(collected / total, 2)
 
-def calc_move_cost(halite_amount):
-    cost_ratio = 1 / constants.MOVE_COST_RATIO
-    return math.floor(halite_amount * cost_ratio)
+def calc_move_cost(halite_amount, inspired=False):
+    return YieldTables.get().move_cost(halite_amount, inspired)
+
+def calc_halite_collection(halite_amount, inspired=False):
+    # an inspired ship also collects the bonus, see engine.inspiration for who is inspired
+    return YieldTables.get().collection(halite_amount, 1, inspired)
+
+
+class YieldTables:
+    """
+    Integer lookup tables of the engine's mining and move cost maths.
+
+    For every cell halite amount up to max_halite and every number of turns
+    up to horizon, the tables hold how much a ship mining the cell collects
+    in total and how much halite is left on the cell, for plain and inspired
+    ships, plus the cost of moving off a cell. Tables are flat arrays indexed
+    by turns * (max_halite + 1) + halite, so hot loops can index them
+    directly; the methods also handle amounts and turns beyond the tables.
+    Built once per set of game constants, see YieldTables.get, or loaded
+    from the startup cache, see engine.precompute.
+    """
+    # The tables, as named in the startup cache
+    TABLES = ('move_costs', 'inspired_move_costs', 'collected', 'remaining', 'inspired_collected',
+              'inspired_remaining')
+
+    _cache = {}
+
+    def __init__(self, extract_ratio, move_cost_ratio, inspired_extract_ratio, inspired_bonus_multiplier,
+                 inspired_move_cost_ratio, max_halite, horizon=YIELD_HORIZON, tables=None):
+        self.extract_ratio = extract_ratio
+        self.move_cost_ratio = move_cost_ratio
+        self.inspired_extract_ratio = inspired_extract_ratio
+        self.inspired_bonus_multiplier = inspired_bonus_multiplier
+        self.inspired_move_cost_ratio = inspired_move_cost_ratio
+        self.max_halite = max_halite
+        self.horizon = horizon
+        self.stride = max_halite + 1
+
+        if tables is not None:
+            # Already built, e.g. int32 views of the memory-mapped startup cache
+            for name in self.TABLES:
+                setattr(self, name, tables[name])
+            return
+
+        amounts = range(self.stride)
+        self.move_costs = array('i', [amount // move_cost_ratio for amount in amounts])
+        self.inspired_move_costs = array('i', [amount // inspired_move_cost_ratio for amount in amounts])
+        self.collected, self.remaining = self._build(extract_ratio, 0)
+        self.inspired_collected, self.inspired_remaining = self._build(inspired_extract_ratio,
+                                                                       inspired_bonus_multiplier)
+
+    def _build(self, extract_ratio, bonus_multiplier):
+        stride = self.stride
+        amounts = range(stride)
+
+        # One turn: ceil(halite / ratio) comes off the cell, the ship also gets the truncated bonus
+        extracted = [-(-amount // extract_ratio) for amount in amounts]
+        after_one = [amount - taken for amount, taken in zip(amounts, extracted)]
+        gained = [taken + int(taken * bonus_multiplier) for taken in extracted]
+
+        # Turn n from a cell is one turn, then n - 1 turns from what that turn left behind
+        collected = array('i', [0] * stride)
+        remaining = array('i', amounts)
+        for turns in range(1, self.horizon + 1):
+            previous = (turns - 1) * stride
+            collected.extend([gained[amount] + collected[previous + after_one[amount]] for amount in amounts])
+            remaining.extend([remaining[previous + after_one[amount]] for amount in amounts])
+        return collected, remaining
+
+    @staticmethod
+    def key():
+        """
+        :return: The game constants the tables depend on
+        """
+        return (constants.EXTRACT_RATIO, constants.MOVE_COST_RATIO, constants.INSPIRED_EXTRACT_RATIO,
+                constants.INSPIRED_BONUS_MULTIPLIER, constants.INSPIRED_MOVE_COST_RATIO, constants.MAX_HALITE,
+                YIELD_HORIZON)
+
+    @staticmethod
+    def get(tables=None):
+        """
+        :param tables: The tables by name, to use rather than building them if they aren't yet
+        :return: The YieldTables for the loaded game constants, built on first use
+        """
+        key = YieldTables.key()
+        yield_tables = YieldTables._cache.get(key)
+        if yield_tables is None:
+            # Ships can drop more than a full hold onto a cell when they collide
+            yield_tables = YieldTables(*key[:5], max_halite=2 * constants.MAX_HALITE, horizon=YIELD_HORIZON,
+                                       tables=tables)
+            YieldTables._cache[key] = yield_tables
+            logging.debug(f"Yield tables {'loaded' if tables is not None else 'built'} for {key}")
+        return yield_tables
+
+    def _mine(self, halite_amount, turns, inspired):
+        # Turn by turn, for amounts and turn counts the tables don't cover
+        if inspired:
+            extract_ratio, bonus_multiplier = self.inspired_extract_ratio, self.inspired_bonus_multiplier
+        else:
+            extract_ratio, bonus_multiplier = self.extract_ratio, 0
+        total = 0
+        for turn in range(turns):
+            taken = -(-halite_amount // extract_ratio)
+            total += taken + int(taken * bonus_multiplier)
+            halite_amount -= taken
+        return total, halite_amount
+
+    def collection(self, halite_amount, turns=1, inspired=False):
+        """
+        :param halite_amount: The halite on the cell
+        :param turns: How many turns the ship mines the cell
+        :param inspired: Whether the ship is inspired
+        :return: The halite the ship collects in total, ignoring the ship's capacity
+        """
+        if halite_amount <= self.max_halite and turns <= self.horizon:
+            table = self.inspired_collected if inspired else self.collected
+            return table[turns * self.stride + halite_amount]
+        return self._mine(halite_amount, turns, inspired)[0]
+
+    def remaining_after(self, halite_amount, turns=1, inspired=False):
+        """
+        :return: The halite left on the cell after a ship mines it for some turns
+        """
+        if halite_amount <= self.max_halite and turns <= self.horizon:
+            table = self.inspired_remaining if inspired else self.remaining
+            return table[turns * self.stride + halite_amount]
+        return self._mine(halite_amount, turns, inspired)[1]
 
-def calc_halite_collection(halite_amount):
-    # this doesn't account for inspiration ratio currently
-    collect_ratio = 1 / constants.EXTRACT_RATIO
-    return math.ceil(halite_amount * collect_ratio)
+    def move_cost(self, halite_amount, inspired=False):
+        """
+        :return: The halite it costs to move off a cell
+        """
+        if halite_amount <= self.max_halite:
+            return (self.inspired_move_costs if inspired else self.move_costs)[halite_amount]
+        return halite_amount // (self.inspired_move_cost_ratio if inspired else self.move_cost_ratio)
@@ -1 +1,2 @@
+from .fleet import FleetManager
 from .processor import TurnProcessor
\ No newline at end of file
@@ -1,67 +1,67 @@
-import logging
+from hlt import eventlog
+
+from engine.system import YieldTables
+from engine.radar import HaliteCell
+
+
+def calc_collection_over_x_turns(halite_amount, num_turns=1, inspired=False):
+    return YieldTables.get().collection(halite_amount, num_turns, inspired)
+
+
+def estimate_collection_if_travel(target_amount, trip_cost, inspired=False):
+    """
+    :param target_amount: The halite on the target cell
+    :param trip_cost: The halite spent moving there, e.g. from a CostField
+    :param inspired: Whether the ship would be inspired on the target
+    :return: What a turn gathering on the target is worth, less the trip
+    """
+    return YieldTables.get().collection(target_amount, 1, inspired) - trip_cost
+
+
+def get_optimal_halite_target(game_map, window, field, inspired=None):
+    """
+    Picks the cell of a radar scan window where travelling to gather beats staying put by the most,
+    costing the trip to each cell along its cheapest route.
+    Only the origin and cells without ships or structures are candidates.
+    :param field: A CostField from the window's origin covering the whole window
+    :param inspired: Our InspirationMap.inspired array, to score inspired cells with the bonus
+    """
+    tables = YieldTables.get()
+    origin_halite = window.halite[window.centre]
+    origin_inspired = inspired is not None and bool(inspired[window.indices[window.centre]])
+    remain_scores = {}
+    collected = tables.collected
+    inspired_collected = tables.inspired_collected
+    stride = tables.stride
+    trip_costs = field.cost
+    trip_steps = field.steps
+
+    best_score = None
+    best_entry = None
+    for entry, (index, halite) in enumerate(zip(window.indices, window.halite)):
+        if entry != window.centre and (window.ship_owner[entry] >= 0 or window.structure_owner[entry] >= 0):
+            continue
+        # Steps is how many moves to get there, +1 to gather when on target
+        steps = trip_steps[index]
+        if steps not in remain_scores:
+            remain_scores[steps] = tables.collection(origin_halite, steps + 1, origin_inspired)
+        target_inspired = inspired is not None and inspired[index]
+        if halite < stride:
+            target = (inspired_collected if target_inspired else collected)[stride + halite]
+        else:
+            target = tables.collection(halite, 1, target_inspired)
+        score = target - trip_costs[index] - remain_scores[steps]
+        if best_score is None or score > best_score:
+            best_score = score
+            best_entry = entry
+
+    track = HaliteCell(
+        game_map.torus.positions[window.indices[best_entry]],
+        window.halite[best_entry],
+        window.distance[best_entry],
+        window.move_cost[best_entry]
+    )
+    eventlog.record("Optimal track: {}, score: {}", track, best_score)
+
+    return best_score, track
 
-from hlt.positionals import Direction
-
-from engine.system import calc_halite_collection, calc_move_cost
-
-
-def calc_collection_over_x_turns(halite_amount, num_turns=1):
-    total = 0
-    cell_amount = halite_amount
-
-    for turn in range(num_turns):
-        collected = calc_halite_collection(cell_amount)
-        total += collected
-        cell_amount -= collected
-
-    return total
-
-
-def estimate_collection_if_travel(origin_amount, target_amount, distance):
-    target = calc_halite_collection(target_amount)
-
-    # TODO: This is a fudge, we need to add up move cost of each cell passed through
-    move_cost = distance * calc_move_cost(origin_amount)
-    
-    return target - move_cost
-
-
-def get_optimal_halite_track(sweep):
-    origin_halite = sweep['origin'].halite_amount
-
-    def calc_move_stay_difference(cell):
-        # Distance is how many cells to get there, +1 to gather when on target
-        num_turns = cell.distance + 1
-        remain_score = calc_collection_over_x_turns(origin_halite, num_turns)
-        move_score = estimate_collection_if_travel(origin_halite, cell.halite_amount, cell.distance)
-        return move_score - remain_score
-
-    priority = sorted([(calc_move_stay_difference(cell), cell) for cell in sweep['halite']], key=lambda x: x[0], reverse=True)
-    logging.debug(f"Sweep Halite Priority: {priority}")
-    logging.info(f"Optimal track: {priority[0][1]}, score: {priority[0][0]}")
-
-    return priority[0]
-
-
-def get_closest_dropoff_move(game_map, ship, dropoff_positions):
-    distances = []
-    for dropoff in dropoff_positions:
-        distance = game_map.calculate_distance(ship.position, dropoff)
-        distances.append((distance, dropoff))
-
-    distances = sorted(distances, key=lambda x: x[0])
-    logging.debug(f"Distances: {distances}")
-
-    closest_dropoff = distances[0]
-
-    move = game_map.naive_navigate(ship, closest_dropoff[1])
-    logging.info("Closest Dropoff: {} -> {}, distance {}, move {}".format(
-        ship.position,
-        closest_dropoff[1],
-        closest_dropoff[0],
-        Direction.convert(move)
-    ))
-    if move == Direction.Still:
-        logging.warning("This shouldn't happen, the nearest dropoff is current position?")
-
-    return move
@@ -0,0 +1,214 @@
+import logging
+
+from hlt import eventlog, timing
+from hlt.entity import ShipStatus
+from hlt.positionals import Direction
+
+from engine.dropoffs import DropoffField
+from engine.inspiration import InspirationMap
+from engine.pathing import PathPlanner
+from engine.reservations import ReservationTable, WINDOW, cooperative_path
+from engine.sites import SiteScorer
+
+from .ship import ShipProcessor
+
+
+# Re-plan a gathering ship once its target holds less than this fraction of the halite it was picked for
+REPLAN_HALITE_FRACTION = 0.5
+
+# Turns a ship may run late on its plan before it is considered stuck and re-planned
+ETA_SLACK = 3
+
+
+class FleetManager:
+    """
+    Keeps every ship's Plan across turns.
+
+    Each turn the plans are checked against what actually happened, which is
+    cheap per ship. Only ships whose plan was invalidated are re-planned:
+    new ships, ships that changed status or arrived, ships that were pushed
+    off their path (collisions), whose target was mined out or taken, and
+    ships running well past their ETA. Plans made with a narrow sweep, for
+    lack of time, are refined on later sweeps while the turn budget allows.
+
+    Every plan also reserves the cells its ship will be in over the next
+    WINDOW turns in a ReservationTable. A new plan whose path runs into
+    another ship's reservations is routed around them with a cooperative
+    space-time search instead, and a kept plan that lost its reservations
+    (the ship was held back a turn) is re-planned if it can't win them back.
+    """
+    def __init__(self, game):
+        self.game = game
+        self.me = game.me
+        self.game_map = game.game_map
+
+        self.dropoff_field = DropoffField(self.game_map.torus)
+        self.planner = PathPlanner(self.game_map)
+        self.inspiration = InspirationMap(self.game_map.torus)
+        self.sites = SiteScorer(self.game_map)
+        self.dropoffs = []
+        self.plans = {}
+        self.processors = {}
+        self.reservations = ReservationTable()
+
+    @timing.timed("FleetManager.begin_turn")
+    def begin_turn(self):
+        """
+        Bring every plan up to date with this turn's game state, dropping plans that no longer hold.
+        :return: The number of ships needing a new plan
+        """
+        self.planner.update()
+        self.inspiration.update(self.game.store)
+        self.sites.track()
+        inspired = self.inspiration.inspired(self.me.id)
+
+        events = self.me.events
+        dropoffs_changed = False
+        if events.new_dropoffs or not self.dropoffs:
+            self.dropoffs = [x.position for x in self.me.get_dropoffs()] + [self.me.shipyard.position]
+            logging.info(f"Dropoffs: {self.dropoffs}")
+            dropoffs_changed = self.dropoff_field.update(self.game_map.index_of(x) for x in self.dropoffs)
+
+        next_turn = self.game.turn_number + 1
+        self.reservations.advance(next_turn)
+        for ship in events.destroyed:
+            self.plans.pop(ship.id, None)
+            self.reservations.release(ship.id)
+
+        ships = self.me.get_ships()
+        self.processors = {}
+        for ship in ships:
+            processor = ShipProcessor(ship.owner, self.game_map, ship, inspired)
+            self.processors[ship.id] = processor
+
+            plan = self.plans.get(ship.id)
+            if plan is None:
+                processor.update_status(self.dropoffs)
+                continue
+            if processor.update_status(self.dropoffs):
+                reason = "status changed"
+            else:
+                reason = self.invalidated(ship, plan, dropoffs_changed) or self.renew_reservations(ship, plan)
+            if reason is not None:
+                eventlog.record("Ship {} re-planning: {}", ship.id, reason)
+                del self.plans[ship.id]
+                self.reservations.release(ship.id)
+
+        return len(ships) - len(self.plans)
+
+    def invalidated(self, ship, plan, dropoffs_changed):
+        """
+        Advance a plan to the ship's current position.
+        :return: Why the plan no longer holds, or None if it still does
+        """
+        position = ship.position
+        if plan.path and position == plan.path[0]:
+            plan.path.pop(0)
+            plan.position = position
+            if not plan.path:
+                # Decide afresh whether to gather here now the ship has seen it
+                return "arrived"
+        elif position != plan.position:
+            # Took another move than planned, or was pushed around by the resolver
+            return "left its path"
+
+        if self.game.turn_number > plan.eta + ETA_SLACK:
+            return "overdue"
+        if plan.status == ShipStatus.DELIVER:
+            return "dropoffs changed" if dropoffs_changed else None
+
+        target = self.game_map[plan.target]
+        if target.halite_amount < plan.target_halite * REPLAN_HALITE_FRACTION:
+            return "target mined out"
+        if len(plan.path) == 1 and target.is_occupied:
+            return "target taken"
+        if plan.path and not self.processors[ship.id].worth_moving_to(target.halite_amount, plan.path,
+                                                                     self.planner.move_costs):
+            return "better to stay"
+        return None
+
+    def _reserved_cells(self, plan):
+        # The cells a plan's ship will be in over the window, gathering ships staying on their target
+        cells = [position.index for position in plan.path[:WINDOW]]
+        if plan.status == ShipStatus.GATHER:
+            cells += [plan.target.index] * (WINDOW - len(cells))
+        return cells
+
+    def renew_reservations(self, ship, plan):
+        """
+        Carry a kept plan's reservations on to the newest turn of the window.
+        :return: Why the plan no longer holds, or None if it still does
+        """
+        next_turn = self.game.turn_number + 1
+        cells = self._reserved_cells(plan)
+        if not cells or self.reservations.holder(cells[0], next_turn) == ship.id:
+            self.reservations.extend(ship.id, cells, next_turn)
+            return None
+        # The ship fell behind its reservations
+        if self.reservations.conflicts(ship.id, cells, next_turn):
+            return "reservation conflict"
+        self.reservations.reserve(ship.id, cells, next_turn)
+        return None
+
+    def reserve(self, ship, plan):
+        """
+        Reserve a new plan's path, routing it around other ships' reservations if it runs into them.
+        """
+        next_turn = self.game.turn_number + 1
+        cells = self._reserved_cells(plan)
+        if plan.path and self.reservations.conflicts(ship.id, cells, next_turn):
+            torus = self.game_map.torus
+            path = cooperative_path(self.reservations, self.planner, ship.id, ship.position.index,
+                                    plan.target.index, self.game.turn_number)
+            # Beyond the window carry on by the most direct route
+            index = path[-1] if path else ship.position.index
+            while index != plan.target.index:
+                index = torus.neighbour(index, torus.directions(index, plan.target.index)[0])
+                path.append(index)
+            plan.path = [torus.positions[index] for index in path]
+            plan.eta = self.game.turn_number + len(path)
+            eventlog.record("Ship {} routed around reservations: {}", ship.id, plan)
+            cells = self._reserved_cells(plan)
+        self.reservations.reserve(ship.id, cells, next_turn)
+
+    def best_dropoff_site(self):
+        """
+        :return: The (score, Position) of the best place for a new dropoff, or None if nowhere is worth it
+        """
+        return self.sites.best(self.dropoff_field, self.inspiration.enemy_counts(self.me.id))
+
+    def plan_ships(self, radius, budget=None):
+        """
+        Plan every ship without a plan, and refine plans made with a narrower sweep than radius.
+        A refined plan heading for the same target keeps its path, so is only routed around reservations once.
+        :param radius: The sweep radius to plan with
+        :param budget: The TurnBudget for this turn, or None to plan every ship
+        :return: The number of ships that still want planning when the budget ran out
+        """
+        pending = [ship for ship in self.me.get_ships()
+                   if ship.id not in self.plans or self.plans[ship.id].radius < radius]
+        for planned, ship in enumerate(pending):
+            if budget is not None and budget.expired():
+                return len(pending) - planned
+            plan = self.processors[ship.id].plan(self.game.turn_number, self.dropoff_field, self.planner, radius)
+            previous = self.plans.get(ship.id)
+            if previous is not None and previous.target == plan.target:
+                # The refinement kept the target, whose path and reservations are already in place
+                previous.radius = plan.radius
+                continue
+            self.reserve(ship, plan)
+            self.plans[ship.id] = plan
+        return 0
+
+    def requests(self):
+        """
+        :return: A list of (ship, directions) for the resolver, ships without a plan hold position
+        """
+        requests = []
+        for ship in self.me.get_ships():
+            plan = self.plans.get(ship.id)
+            if plan is None:
+                requests.append((ship, [Direction.Still]))
+            else:
+                requests.append((ship, self.processors[ship.id].requested_moves(plan, self.dropoffs)))
+        return requests
@@ -1,37 +1,97 @@
 import logging
+import time
 
-from hlt import constants
+from hlt import commands, constants, timing
+from hlt.positionals import Direction
 
-from .ship import ShipProcessor
+from engine.resolver import resolve_moves
+
+from .fleet import FleetManager
+from .ship import SWEEP_RADII
 
 
 class TurnProcessor:
-    def __init__(self, game):
+    def __init__(self, game, fleet=None):
         self.game = game
         self.me = game.me
         self.game_map = game.game_map
 
+        # The fleet manager should outlive the turn, so ship plans carry over
+        self.fleet = fleet or FleetManager(game)
+
         self.command_queue = []
 
     def add_command(self, command):
         # TODO: We should have some error checking logic here
         self.command_queue.append(command)
 
+    @timing.timed("TurnProcessor.pre_execute")
     def pre_execute(self):
-        self.dropoffs = [x.position for x in self.me.get_dropoffs()] + [self.me.shipyard.position]
-        logging.info(f"Dropoffs: {self.dropoffs}")
+        replanning = self.fleet.begin_turn()
+        logging.info(f"Ships to plan: {replanning} of {len(self.me.get_ships())}")
 
-    def run(self):
+    @timing.timed("TurnProcessor.run")
+    def run(self, budget=None, watchdog=None):
+        """
+        Plan this turn's commands, refining new plans with wider radar sweeps while the budget allows.
+        :param budget: The TurnBudget for this turn, or None to run every refinement
+        :param watchdog: A Watchdog to keep updated with the best plan found so far
+        :return: The command list
+        """
         self.pre_execute()
 
-        for ship in self.me.get_ships():
-            processor = ShipProcessor(ship.owner, self.game_map, ship)
-            self.add_command(processor.process(self.dropoffs))
+        enemy_cells = self.enemy_cells()
+
+        self.resolution = None
+        previous_radius = None
+        previous_duration = None
+        for radius in SWEEP_RADII:
+            if budget is not None and previous_duration is not None:
+                # Only refine if the wider sweep is expected to finish in time
+                expected = previous_duration * ((2 * radius + 1) / (2 * previous_radius + 1)) ** 2
+                if expected > budget.remaining():
+                    break
+
+            started = time.perf_counter()
+            unplanned = self.fleet.plan_ships(radius, budget)
+
+            # Settle every ship's move together so friendly ships never collide
+            self.resolution = resolve_moves(self.fleet.requests(), enemy_cells)
+            if watchdog is not None:
+                watchdog.update(self.move_commands(self.resolution.moves))
+
+            if unplanned:
+                logging.warning(f"Out of time planning with sweep radius {radius}, "
+                                f"{unplanned} ships keep their previous plan or hold")
+                break
+
+            previous_radius = radius
+            previous_duration = time.perf_counter() - started
+
+        for ship, direction in self.resolution.moves:
+            self.add_command(ship.move(direction))
 
         self.post_execute()
 
         return self.command_queue
 
+    @staticmethod
+    def move_commands(moves):
+        """
+        The commands for a list of (ship, direction), built without logging each move like Ship.move does.
+        """
+        return ["{} {} {}".format(commands.MOVE, ship.id, Direction.convert(direction)) for ship, direction in moves]
+
+    def enemy_cells(self):
+        """
+        :return: The indices of cells currently occupied by enemy ships
+        """
+        store = self.game.store
+        index = self.game_map.torus.index
+        return {index(store.xs[slot], store.ys[slot])
+                for slot in store.live_slots() if store.owners[slot] != self.me.id}
+
+    @timing.timed("TurnProcessor.post_execute")
     def post_execute(self):
         if len(self.me.get_ships()) < 1:
             self.add_command(self.me.shipyard.spawn())
@@ -42,5 +102,5 @@ class TurnProcessor:
         # Don't spawn a ship if you currently have a ship at port, though - the ships will collide.
         if self.game.turn_number <= 200 \
             and self.me.halite_amount >= constants.SHIP_COST \
-            and not self.game_map[self.me.shipyard].is_occupied:
+            and self.game_map.index_of(self.me.shipyard) not in self.resolution.claimed:
             self.add_command(self.me.shipyard.spawn())
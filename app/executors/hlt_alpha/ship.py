@@ -1,13 +1,18 @@
 import logging
 from collections import namedtuple
 
+from hlt import eventlog, timing
 from hlt.entity import ShipStatus
 from hlt.positionals import Direction
 
-from engine.system import calc_halite_collection, calc_move_cost
-from engine.radar import radar_sweep
+from engine.system import YieldTables
+from engine.radar import scan
 
-from .collection import get_closest_dropoff_move, get_optimal_halite_track
+from .collection import calc_collection_over_x_turns, estimate_collection_if_travel, get_optimal_halite_target
+
+
+# How many cells in each direction a gathering ship scans for halite, widened while time allows
+SWEEP_RADII = (1, 4, 8)
 
 
 class OriginCell( namedtuple("Cell", ['position', 'total', 'collect', 'move_cost']) ):
@@ -23,57 +28,154 @@ class OriginCell( namedtuple("Cell", ['position', 'total', 'collect', 'move_cost
         )
 
 
+class Plan:
+    """
+    A ship's standing orders, kept across turns until something invalidates them.
+
+    target is the Position the ship is heading for, path the Positions it
+    will pass through to get there (next step first, empty once arrived,
+    a Position repeated where the ship waits for another to pass),
+    eta the turn it should arrive on, radius the sweep radius the target was
+    picked with and target_halite the halite on the target when planned.
+    """
+    __slots__ = ('status', 'target', 'path', 'eta', 'radius', 'target_halite', 'position')
+
+    def __init__(self, status, target, path, eta, radius, target_halite, position):
+        self.status = status
+        self.target = target
+        self.path = path
+        self.eta = eta
+        self.radius = radius
+        self.target_halite = target_halite
+        self.position = position
+
+    def __repr__(self):
+        return "Plan({}, target={}, steps={}, eta={}, radius={})".format(
+            self.status, self.target, len(self.path), self.eta, self.radius)
+
+
 class ShipProcessor:
-    def __init__(self, player_id, game_map, ship):
+    def __init__(self, player_id, game_map, ship, inspired=None):
         self.player_id = player_id
         self.game_map = game_map
         self.ship = ship
+        # Our InspirationMap.inspired array, None to ignore inspiration
+        self.inspired = inspired
 
         self.origin_cell = self._build_origin_cell(game_map, ship)
 
-        logging.info(f"==== {self.ship} ====")
-        logging.info(f"{self.origin_cell}")
+        eventlog.record("==== Ship(id={}, {}, cargo={}, status={}) ====",
+                        ship.id, ship.position, ship.halite_amount, ship.status)
+        eventlog.record("{}", self.origin_cell)
 
     def _build_origin_cell(self, game_map, ship):
         # how much halite could we collect from current position if we remained
         home_halite_amount = game_map[ship.position].halite_amount
-        
+        tables = YieldTables.get()
+        inspired = self.is_inspired(ship.position)
+
         return OriginCell(
             ship.position,
             home_halite_amount,
-            calc_halite_collection(home_halite_amount),
-            calc_move_cost(home_halite_amount)
+            tables.collection(home_halite_amount, 1, inspired),
+            tables.move_cost(home_halite_amount, inspired)
         )
 
-    def process(self, dropoffs):
-        if not self.ship_can_move():
-            return self.ship.stay_still()
-
-        # determine whether to deliver cargo, continue mining or search for next mining spot
+    def is_inspired(self, position):
+        return self.inspired is not None and bool(self.inspired[position.index])
 
+    def update_status(self, dropoffs):
+        """
+        Switch between gathering and delivering as cargo fills up and is dropped off.
+        :return: True if the status changed
+        """
+        status = self.ship.status
         self.check_cargo_capacity()
         self.check_if_dropoff_location(dropoffs)
-
+        return self.ship.status != status
+
+    @timing.timed("ShipProcessor.plan")
+    def plan(self, turn_number, dropoff_field, planner, sweep_radius=SWEEP_RADII[0]):
+        """
+        Pick a target and the path to it for the ship's current status.
+        :param turn_number: The current turn, to work out the ETA
+        :param dropoff_field: The DropoffField for our dropoffs
+        :param planner: The PathPlanner, for the cheapest routes to gathering targets
+        :param sweep_radius: How far a gathering ship looks for halite
+        :return: A new Plan
+        """
         if self.ship.status == ShipStatus.DELIVER:
-            # move towards nearest dropoff point
-            return self.move_to_nearest_dropoff(dropoffs)
-
-        if self.ship.status == ShipStatus.GATHER:
-            sweep = radar_sweep(self.player_id, self.game_map, self.ship.position)
-            return self.determine_optimal_action(sweep)
-
-        logging.warning("We shouldn't get here, as it means the ship doesn't know what to do")
-        return self.ship.move_randomly()
+            index = self.ship.position.index
+            target = dropoff_field.nearest_position(index)
+            positions = self.game_map.torus.positions
+            path = []
+            while index != target.index:
+                index = dropoff_field.next_index(index)
+                path.append(positions[index])
+            # Delivery plans don't depend on the sweep, so there is nothing to refine
+            sweep_radius = SWEEP_RADII[-1]
+        else:
+            if self.ship.status != ShipStatus.GATHER:
+                logging.warning("We shouldn't get here, as it means the ship doesn't know what to do")
+            window = scan(self.game_map, self.ship.position, sweep_radius)
+            # Corner to corner of the window, so every cell in it has a route
+            field = planner.field(self.ship.position.index, 2 * window.radius)
+            score, track = get_optimal_halite_target(self.game_map, window, field, self.inspired)
+            target = track.position
+            positions = self.game_map.torus.positions
+            path = [positions[index] for index in field.path_to(target.index)]
+
+        plan = Plan(self.ship.status, target, path, turn_number + len(path), sweep_radius,
+                    self.game_map[target].halite_amount, self.ship.position)
+        eventlog.record("Ship {} planned {}", self.ship.id, plan)
+        return plan
+
+    def worth_moving_to(self, target_amount, path, move_costs):
+        """
+        Scores a target the same way get_optimal_halite_target does, from where the ship is now.
+        :param target_amount: The halite on the target
+        :param path: The Positions still to pass through, ending on the target, waits repeating a Position
+        :param move_costs: The move cost of every cell, by flat index
+        :return: True if travelling to the target still beats gathering here
+        """
+        trip_cost = sum(move_costs[position.index] for position, following in zip(path, path[1:])
+                        if position != following)
+        if path[0] != self.ship.position:
+            trip_cost += self.origin_cell.move_cost
+        remain_score = calc_collection_over_x_turns(self.origin_cell.total, len(path) + 1,
+                                                    self.is_inspired(self.ship.position))
+        return estimate_collection_if_travel(target_amount, trip_cost, self.is_inspired(path[-1])) > remain_score
+
+    def requested_moves(self, plan, dropoffs):
+        """
+        Decide where this ship would like to go this turn, following its plan.
+        :param plan: The ship's current Plan
+        :param dropoffs: Positions of all our dropoffs and the shipyard
+        :return: A list of Directions, best first. The fleet resolver picks the one the ship actually takes.
+        """
+        position = self.ship.position
+        if not self.ship_can_move() or not plan.path or plan.path[0] == position:
+            # Stay to gather on target, until there is enough cargo to pay for the move,
+            # or to wait for another ship to pass
+            return [Direction.Still]
+
+        torus = self.game_map.torus
+        best = torus.directions(position.index, plan.path[0].index)[0]
+        if plan.status == ShipStatus.DELIVER and plan.path[0] in dropoffs:
+            eventlog.record("Ship depositing: {} halite", self.ship.halite_amount - self.origin_cell.move_cost)
+
+        # The planned step first, then any other move that also gets closer to the target
+        moves = [best] + [x for x in torus.directions(position.index, plan.target.index) if x != best]
+        return moves + [Direction.Still]
 
     def ship_can_move(self):
         if self.origin_cell.move_cost > self.ship.halite_amount:
             # Ship can't move anywhere until gathered enough halite to move
-            logging.debug("Ship {} {} not enough halite to move: {} / {}".format(
-                self.ship.id,
-                self.ship.position,
-                self.origin_cell.move_cost,
-                self.ship.halite_amount
-            ))
+            eventlog.record("Ship {} {} not enough halite to move: {} / {}",
+                            self.ship.id,
+                            self.ship.position,
+                            self.origin_cell.move_cost,
+                            self.ship.halite_amount)
             return False
 
         return True
@@ -87,26 +189,3 @@ class ShipProcessor:
         if self.ship.position in dropoffs:
             # Ship has dropped off, needs to move back onto the grid
             self.ship.status = ShipStatus.GATHER
-
-    def move_to_nearest_dropoff(self, dropoffs):
-        direction = get_closest_dropoff_move(self.game_map, self.ship, dropoffs)
-        next_position = self.ship.position.directional_offset(direction)
-        if next_position in dropoffs:
-            logging.info("Ship depositing: {} halite".format(
-                self.ship.halite_amount - self.origin_cell.move_cost
-            ))
-        return self.ship.move(direction)
-
-    def determine_optimal_action(self, sweep):
-        # calculate optimal track from radar sweep
-        score, track = get_optimal_halite_track(sweep)
-
-        if track.position == self.ship.position:
-            # optimal collecting point is current position
-            return self.ship.stay_still()
-
-        # move to next position
-        direction = self.game_map.naive_navigate(self.ship, track.position)
-        if direction == Direction.Still:
-            logging.warning(f"Optimal track didn't pick up on current position being best: {self.ship.id} {track}")
-        return self.ship.move(direction)
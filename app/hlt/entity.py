@@ -1,29 +1,39 @@
-import logging
 import abc
+import random
 
-from . import commands, constants
+from . import commands, constants, eventlog
 from .positionals import Direction, Position
-from .common import read_input
+
+
+def describe_move(label, ship_id, position, direction, status, raw_direction):
+    """
+    Formats a ship move for the event log, only called when the log is dumped.
+    """
+    return f"{label}: {ship_id}, {position} -> {position.directional_offset(direction)}, {status}, {raw_direction}"
 
 
 class Entity(abc.ABC):
     """
     Base Entity Class from whence Ships, Dropoffs and Shipyards inherit
     """
+    __slots__ = ()
+
     def __init__(self, owner, id, position):
         self.owner = owner
         self.id = id
         self.position = position
 
     @staticmethod
-    def _generate(player_id):
+    def _generate(player_id, entity_id, x_position, y_position):
         """
         Method which creates an entity for a specific player given input from the engine.
         :param player_id: The player id for the player who owns this entity
+        :param entity_id: The id of the entity
+        :param x_position: The x coordinate of the entity
+        :param y_position: The y coordinate of the entity
         :return: An instance of Entity along with its id
         """
-        ship_id, x_position, y_position = map(int, read_input().split())
-        return ship_id, Entity(player_id, ship_id, Position(x_position, y_position))
+        return entity_id, Entity(player_id, entity_id, Position(x_position, y_position))
 
     def __repr__(self):
         return "{}(id={}, {})".format(self.__class__.__name__,
@@ -41,7 +51,17 @@ class Dropoff(Entity):
     """
     Dropoff class for housing dropoffs
     """
-    pass
+    @staticmethod
+    def _generate(player_id, dropoff_id, x_position, y_position):
+        """
+        Creates an instance of a dropoff for a given player given the engine's input.
+        :param player_id: The id of the player who owns this dropoff
+        :param dropoff_id: The id of the dropoff
+        :param x_position: The x coordinate of the dropoff
+        :param y_position: The y coordinate of the dropoff
+        :return: The dropoff id and dropoff object
+        """
+        return dropoff_id, Dropoff(player_id, dropoff_id, Position(x_position, y_position))
 
 
 class Shipyard(Entity):
@@ -64,14 +84,40 @@ class ShipStatus:
 
 class Ship(Entity):
     """
-    Ship class to house ship entities
+    Ship class to house ship entities.
+    A view onto the ship's slot in the game's EntityStore, only valid while the ship is alive.
     """
-    __ships = {}
+    __slots__ = ('owner', 'id', '_store', '_slot')
+
+    def __init__(self, store, slot):
+        self._store = store
+        self._slot = slot
+        super().__init__(store.owners[slot], store.ids[slot], Position(store.xs[slot], store.ys[slot]))
+
+    @property
+    def position(self):
+        return Position(self._store.xs[self._slot], self._store.ys[self._slot])
 
-    def __init__(self, owner, id, position, halite_amount):
-        super().__init__(owner, id, position)
-        self.status = ShipStatus.GATHER
-        self.halite_amount = halite_amount
+    @position.setter
+    def position(self, position):
+        self._store.xs[self._slot] = position.x
+        self._store.ys[self._slot] = position.y
+
+    @property
+    def halite_amount(self):
+        return self._store.cargo[self._slot]
+
+    @halite_amount.setter
+    def halite_amount(self, halite_amount):
+        self._store.cargo[self._slot] = halite_amount
+
+    @property
+    def status(self):
+        return self._store.status[self._slot]
+
+    @status.setter
+    def status(self, status):
+        self._store.status[self._slot] = status
 
     @property
     def is_full(self):
@@ -96,7 +142,7 @@ class Ship(Entity):
         """
         direction = random.choice([ Direction.North, Direction.South, Direction.East, Direction.West ])
         raw_direction = Direction.convert(direction)
-        logging.info(f"Move Random: {ship.id}, {ship.position} -> {ship.position.directional_offset(direction)}, {ship.status}, {raw_direction}")
+        eventlog.record(describe_move, "Move Random", self.id, self.position, direction, self.status, raw_direction)
         return "{} {} {}".format(commands.MOVE, self.id, raw_direction)
 
     def move(self, direction):
@@ -107,40 +153,16 @@ class Ship(Entity):
         raw_direction = direction
         if not isinstance(direction, str) or direction not in "nsewo":
             raw_direction = Direction.convert(direction)
-        logging.info(f"Move Direction: {self.id}, {self.position} -> {self.position.directional_offset(direction)}, {self.status}, {raw_direction}")
+        eventlog.record(describe_move, "Move Direction", self.id, self.position, direction, self.status, raw_direction)
         return "{} {} {}".format(commands.MOVE, self.id, raw_direction)
 
     def stay_still(self):
         """
         Don't move this ship.
         """
-        logging.info(f"Hold Position: {self.id}, {self.position}, {self.status}")
+        eventlog.record("Hold Position: {}, {}, {}", self.id, self.position, self.status)
         return "{} {} {}".format(commands.MOVE, self.id, commands.STAY_STILL)
 
-    @staticmethod
-    def _generate(player_id):
-        """
-        Creates an instance of a ship for a given player given the engine's input.
-        If an instance with the same ship.id has previously been generated, that instance will be returned.
-        :param player_id: The id of the player who owns this ship
-        :return: The ship id and ship object
-        """
-        # Read game engine input
-        ship_id, x_position, y_position, halite = map(int, read_input().split())
-
-        # Check storage to see if ship already exists
-        # If the ship exists, update its position and halite
-        if ship_id in Ship.__ships.keys():    
-            old_ship = Ship.__ships[ship_id]
-            old_ship.position = Position(x_position, y_position)
-            old_ship.halite_amount = halite
-            return ship_id, old_ship
-        else:
-            # Otherwise, create and return a new instance
-            new_ship = Ship(player_id, ship_id, Position(x_position, y_position), halite)
-            Ship.__ships[ship_id] = new_ship
-            return ship_id, new_ship
-
     def __repr__(self):
         return "{}(id={}, {}, cargo={} ({} remaining), status={})".format(self.__class__.__name__,
                                                        self.id,
@@ -0,0 +1,92 @@
+"""
+Deferred, structured logging for the per-ship hot path.
+
+record() stores a compact (turn, template, args) tuple in a fixed size
+ring buffer without formatting anything. The buffer is only formatted and
+written to the bot log (bot-{id}.log) by dump(), which install() arranges
+to happen when an error is logged and on an uncaught exception. At the
+end of a game only the last GAME_END_TURNS turns are written. Arguments
+must not change after being recorded (ids, numbers, strings, positions),
+since they are only formatted later.
+"""
+import collections
+import logging
+import sys
+
+
+# How many events are kept, older ones are dropped first
+CAPACITY = 50000
+
+# How many of the last turns' events are written when a game ends normally
+GAME_END_TURNS = 5
+
+"""The turn recorded events belong to, kept up to date by Game.update_frame."""
+turn_number = 0
+
+_events = collections.deque(maxlen=CAPACITY)
+_installed = False
+
+
+def record(template, *args):
+    """
+    Record an event for the bot log without formatting it.
+    :param template: A str.format template, or a callable returning the message given args
+    :param args: The values to format the message with
+    """
+    _events.append((turn_number, template, args))
+
+
+def _format(template, args):
+    if callable(template):
+        return template(*args)
+    return template.format(*args)
+
+
+def dump(last_turns=None):
+    """
+    Format every buffered event into the bot log, oldest first, and empty the buffer.
+    Does nothing until install() has been called, so offline tools never pay for formatting.
+    :param last_turns: Only write the events of this many of the latest turns, or None for every event
+    """
+    if not _installed:
+        return
+    if last_turns is not None:
+        while _events and _events[0][0] <= turn_number - last_turns:
+            _events.popleft()
+    logger = logging.getLogger()
+    while _events:
+        turn, template, args = _events.popleft()
+        try:
+            message = "[turn {:03}] {}".format(turn, _format(template, args))
+        except Exception as error:
+            message = "[turn {:03}] unformattable event {!r} {!r}: {!r}".format(turn, template, args, error)
+        # Written regardless of the log level, the buffer is the record of what happened
+        logger.handle(logger.makeRecord(logger.name, logging.INFO, __file__, 0, message, None, None))
+
+
+class _DumpOnError(logging.Handler):
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, log_record):
+        dump()
+
+
+def install():
+    """
+    Dump the buffer when an error is logged and on an uncaught exception.
+    """
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    logging.getLogger().addHandler(_DumpOnError())
+
+    previous_hook = sys.excepthook
+
+    def excepthook(*exc_info):
+        dump()
+        previous_hook(*exc_info)
+
+    sys.excepthook = excepthook
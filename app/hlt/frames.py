@@ -0,0 +1,108 @@
+"""
+Bulk readers for the game engine's input.
+
+Rather than reading and splitting one line at a time, each block of lines
+(the map, a player's ships, the cell updates) is read in one go from the
+binary stdin buffer and parsed straight into an integer array.
+"""
+import json
+import logging
+import sys
+from array import array
+from collections import namedtuple
+
+from . import eventlog
+
+
+"""A player's state for one turn: ships are (id, x, y, halite) and dropoffs (id, x, y) records, flattened."""
+PlayerFrame = namedtuple('PlayerFrame', ['id', 'halite', 'ships', 'dropoffs'])
+
+"""One turn of engine input: cells are flattened (x, y, halite) records for the cells that changed."""
+Frame = namedtuple('Frame', ['turn_number', 'players', 'cells'])
+
+
+def records(data, width):
+    """
+    Iterates over a flat array as tuples of width items each.
+    :param data: The flat array
+    :param width: The number of items per record
+    :return: An iterator of tuples
+    """
+    return zip(*[iter(data)] * width)
+
+
+class FrameReader:
+    """
+    Reads the game engine input from a binary stream, stdin by default.
+    """
+    def __init__(self, stream=None):
+        self._stream = stream if stream is not None else sys.stdin.buffer
+
+    def _end_of_input(self):
+        eventlog.dump(eventlog.GAME_END_TURNS)
+        logging.shutdown()
+        raise SystemExit(EOFError("EOF when reading engine input"))
+
+    def _read_line(self):
+        line = self._stream.readline()
+        if not line:
+            self._end_of_input()
+        return line
+
+    def _read_ints(self, num_lines, num_items):
+        """
+        Reads a block of lines and parses every integer in it.
+        :param num_lines: How many lines to read
+        :param num_items: How many integers the block holds
+        :return: The integers as an array
+        """
+        readline = self._stream.readline
+        data = array('i', map(int, b' '.join([readline() for _ in range(num_lines)]).split()))
+        if len(data) != num_items:
+            self._end_of_input()
+        return data
+
+    def read_constants(self):
+        """
+        :return: The game constants as a dictionary
+        """
+        return json.loads(self._read_line())
+
+    def read_header(self):
+        """
+        :return: The number of players and our player id
+        """
+        num_players, my_id = map(int, self._read_line().split())
+        return num_players, my_id
+
+    def read_players(self, num_players):
+        """
+        :return: A list of (player id, shipyard x, shipyard y) tuples
+        """
+        return list(records(self._read_ints(num_players, num_players * 3), 3))
+
+    def read_map(self):
+        """
+        :return: The map width, height and the halite of every cell as a row-major array
+        """
+        map_width, map_height = map(int, self._read_line().split())
+        return map_width, map_height, self._read_ints(map_height, map_width * map_height)
+
+    def read_turn(self, num_players):
+        """
+        Reads a whole turn of input.
+        :param num_players: The number of players in the game
+        :return: The Frame for this turn
+        """
+        turn_number = int(self._read_line())
+
+        players = []
+        for _ in range(num_players):
+            player, num_ships, num_dropoffs, halite = map(int, self._read_line().split())
+            ships = self._read_ints(num_ships, num_ships * 4)
+            dropoffs = self._read_ints(num_dropoffs, num_dropoffs * 3)
+            players.append(PlayerFrame(player, halite, ships, dropoffs))
+
+        num_cells = int(self._read_line())
+        cells = self._read_ints(num_cells, num_cells * 3)
+        return Frame(turn_number, players, cells)
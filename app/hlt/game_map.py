@@ -1,47 +1,90 @@
 import queue
+from array import array
 
 from . import constants
+from . import timing
 from .entity import Entity, Shipyard, Ship, Dropoff
 from .player import Player
-from .positionals import Direction, Position
-from .common import read_input
+from .positionals import Direction, Position, set_grid
+from .torus import Torus
+from .frames import records
 
 
 class MapCell:
-    """A cell on the game map."""
-    def __init__(self, position, halite_amount):
+    """
+    A cell on the game map.
+
+    MapCell is a lightweight view onto the arrays backing the GameMap, so
+    reads and writes go straight through to the board state.
+    """
+    __slots__ = ('_game_map', '_index', 'position')
+
+    def __init__(self, game_map, index, position):
+        self._game_map = game_map
+        self._index = index
         self.position = position
-        self.halite_amount = halite_amount
-        self.ship = None
-        self.structure = None
+
+    @property
+    def halite_amount(self):
+        """
+        :return: The halite currently held in this cell
+        """
+        return self._game_map.halite[self._index]
+
+    @halite_amount.setter
+    def halite_amount(self, halite_amount):
+        self._game_map.halite[self._index] = halite_amount
+
+    @property
+    def ship(self):
+        """
+        :return: The ship occupying this cell, or None
+        """
+        return self._game_map._ship_at(self._index)
+
+    @ship.setter
+    def ship(self, ship):
+        self._game_map._place_ship(self._index, ship)
+
+    @property
+    def structure(self):
+        """
+        :return: The shipyard or dropoff in this cell, or None
+        """
+        return self._game_map._structures.get(self._index)
+
+    @structure.setter
+    def structure(self, structure):
+        self._game_map._place_structure(self._index, structure)
 
     @property
     def is_empty(self):
         """
         :return: Whether this cell has no ships or structures
         """
-        return self.ship is None and self.structure is None
+        return self._game_map.ship_ids[self._index] < 0 and self._game_map.structure_owners[self._index] < 0
 
     @property
     def is_occupied(self):
         """
         :return: Whether this cell has any ships
         """
-        return self.ship is not None
+        return self._game_map.ship_ids[self._index] >= 0
 
     @property
     def has_structure(self):
         """
         :return: Whether this cell has any structures
         """
-        return self.structure is not None
+        return self._game_map.structure_owners[self._index] >= 0
 
     @property
     def structure_type(self):
         """
         :return: What is the structure type in this cell
         """
-        return None if not self.structure else type(self.structure)
+        structure = self.structure
+        return None if not structure else type(structure)
 
     def mark_unsafe(self, ship):
         """
@@ -49,7 +92,7 @@ class MapCell:
 
         Use in conjunction with GameMap.naive_navigate.
         """
-        self.ship = ship
+        self._game_map._place_ship(self._index, ship)
 
     def __eq__(self, other):
         return self.position == other.position
@@ -67,13 +110,30 @@ class GameMap:
 
     Can be indexed by a position, or by a contained entity.
     Coordinates start at 0. Coordinates are normalized for you
+
+    The board is stored as flat, row-major arrays (index = y * width + x):
+    halite holds the halite per cell, ship_ids and ship_owners the id and
+    owner of the ship occupying each cell (-1 when empty) and structure_owners the owner of the shipyard
+    or dropoff in each cell (-1 when none). These arrays can be read directly
+    for whole-board queries. changed_cells lists the indices whose halite
+    changed on the last update. torus holds the distance and direction
+    lookup tables for this map size.
     """
-    def __init__(self, cells, width, height, total_halite):
+    def __init__(self, halite, width, height, total_halite):
         self.width = width
         self.height = height
         self.halite_total = total_halite
         self.halite_remaining = total_halite
-        self._cells = cells
+        self.halite = halite
+        self.torus = Torus.get(width, height)
+        set_grid(self.torus)
+        self.ship_ids = array('i', [-1]) * (width * height)
+        self.ship_owners = array('i', [-1]) * (width * height)
+        self.structure_owners = array('i', [-1]) * (width * height)
+        self.changed_cells = []
+        self._ships = {}
+        self._structures = {}
+        self._occupied = []
 
     def __getitem__(self, location):
         """
@@ -81,12 +141,47 @@ class GameMap:
         :param location: the position or entity to access in this map
         :return: the contents housing that cell or entity
         """
-        if isinstance(location, Position):
+        if isinstance(location, Entity):
+            location = location.position
+        elif not isinstance(location, Position):
+            return None
+        if location.index is None:
             location = self.normalize(location)
-            return self._cells[location.y][location.x]
-        elif isinstance(location, Entity):
-            return self._cells[location.position.y][location.position.x]
-        return None
+        return MapCell(self, location.index, location)
+
+    def index_of(self, location):
+        """
+        Flat array index of a position or entity within the game map.
+        :param location: the position or entity to locate
+        :return: the index of that cell in the board arrays
+        """
+        if isinstance(location, Entity):
+            location = location.position
+        if location.index is None:
+            return (location.y % self.height) * self.width + location.x % self.width
+        return location.index
+
+    def _ship_at(self, index):
+        ship_id = self.ship_ids[index]
+        return None if ship_id < 0 else self._ships[ship_id]
+
+    def _place_ship(self, index, ship):
+        if ship is None:
+            self.ship_ids[index] = -1
+            self.ship_owners[index] = -1
+        else:
+            self.ship_ids[index] = ship.id
+            self.ship_owners[index] = ship.owner
+            self._ships[ship.id] = ship
+            self._occupied.append(index)
+
+    def _place_structure(self, index, structure):
+        if structure is None:
+            self.structure_owners[index] = -1
+            self._structures.pop(index, None)
+        else:
+            self.structure_owners[index] = structure.owner
+            self._structures[index] = structure
 
     def calculate_distance(self, source, target):
         """
@@ -96,11 +191,7 @@ class GameMap:
         :param target: The target to where calculate
         :return: The distance between these items
         """
-        source = self.normalize(source)
-        target = self.normalize(target)
-        resulting_position = abs(source - target)
-        return min(resulting_position.x, self.width - resulting_position.x) + \
-            min(resulting_position.y, self.height - resulting_position.y)
+        return self.torus.distance(self.index_of(source), self.index_of(target))
 
     def normalize(self, position):
         """
@@ -134,19 +225,7 @@ class GameMap:
         :param destination: The destination towards which you wish to move your object.
         :return: A list of valid (closest) Directions towards your target.
         """
-        source = self.normalize(source)
-        destination = self.normalize(destination)
-        possible_moves = []
-        distance = Position(abs(destination.x-source.x), abs(destination.y-source.y))
-        y_cardinality, x_cardinality = self._get_target_direction(source, destination)
-
-        if distance.x != 0:
-            possible_moves.append(x_cardinality if distance.x < (self.width / 2)
-                                  else Direction.invert(x_cardinality))
-        if distance.y != 0:
-            possible_moves.append(y_cardinality if distance.y < (self.height / 2)
-                                  else Direction.invert(y_cardinality))
-        return possible_moves
+        return self.torus.directions(self.index_of(source), self.index_of(destination))
 
     def naive_navigate(self, ship, destination):
         """
@@ -158,49 +237,55 @@ class GameMap:
         """
         # No need to normalize destination, since get_unsafe_moves
         # does that
+        source = self.index_of(ship.position)
         for direction in self.get_unsafe_moves(ship.position, destination):
-            target_pos = ship.position.directional_offset(direction)
-            if not self[target_pos].is_occupied:
-                self[target_pos].mark_unsafe(ship)
+            target = self.torus.neighbour(source, direction)
+            if self.ship_ids[target] < 0:
+                self._place_ship(target, ship)
                 return direction
 
         return Direction.Still
 
     @staticmethod
-    def _generate():
+    def _generate(map_width, map_height, halite):
         """
         Creates a map object from the input given by the game engine
+        :param map_width: The map width
+        :param map_height: The map height
+        :param halite: Row-major array of the halite in every cell
         :return: The map object
         """
-        map_width, map_height = map(int, read_input().split())
-        halite_total = 0
-        game_map = [[None for _ in range(map_width)] for _ in range(map_height)]
-        for y_position in range(map_height):
-            cells = read_input().split()
-            for x_position in range(map_width):
-                halite_amount = int(cells[x_position])
-                halite_total += halite_amount
-                game_map[y_position][x_position] = MapCell(Position(x_position, y_position,
-                                                                    normalize=False),
-                                                           halite_amount)
-        return GameMap(game_map, map_width, map_height, halite_total)
-
-    def _update(self):
-        """
-        Updates this map object from the input given by the game engine
-        :return: nothing
-        """
-        for _ in range(int(read_input())):
-            cell_x, cell_y, cell_energy = map(int, read_input().split())
-            self[Position(cell_x, cell_y)].halite_amount = cell_energy
+        return GameMap(halite, map_width, map_height, sum(halite))
 
-        halite_remaining = 0
-        # Iterate over each map cell and update state
-        for y in range(self.height):
-            for x in range(self.width):
-                # Update remaining map available halite
-                halite_remaining += self[Position(x, y)].halite_amount
+    @timing.timed("GameMap._update")
+    def _update(self, cells):
+        """
+        Updates this map object from the input given by the game engine.
 
-                # Mark cells as safe for navigation (will re-mark unsafe cells later)
-                self[Position(x, y)].ship = None
+        Only the cells reported as changed by the engine and the cells that
+        held ships last turn are touched, so the cost scales with the number
+        of changes rather than with the board area.
+        :param cells: Flat array of (x, y, halite) records for the cells that changed
+        :return: nothing
+        """
+        halite = self.halite
+        width = self.width
+        changed_cells = []
+        halite_remaining = self.halite_remaining
+        for cell_x, cell_y, cell_energy in records(cells, 3):
+            index = cell_y * width + cell_x
+            # Keep the remaining map available halite as a running total
+            halite_remaining += cell_energy - halite[index]
+            halite[index] = cell_energy
+            changed_cells.append(index)
         self.halite_remaining = halite_remaining
+        self.changed_cells = changed_cells
+
+        # Mark cells as safe for navigation (will re-mark unsafe cells later)
+        ship_ids = self.ship_ids
+        ship_owners = self.ship_owners
+        for index in self._occupied:
+            ship_ids[index] = -1
+            ship_owners[index] = -1
+        self._occupied = []
+        self._ships = {}
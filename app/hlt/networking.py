@@ -1,43 +1,63 @@
-import json
 import logging
+import os
 import sys
+import time
 
-from .common import read_input
-from . import constants
+from . import constants, eventlog, snapshots, timing
+from .frames import FrameReader
 from .game_map import GameMap, Player
+from .positionals import Position
+from .store import EntityStore
+
+
+# Set to any value to keep bots from writing bot-{id}.log, e.g. in tournaments
+NO_LOG_VARIABLE = "HALITE_NO_BOT_LOG"
 
 
 class Game:
     """
     The game object holds all metadata pertinent to the game and all its contents
     """
-    def __init__(self, log_level=logging.DEBUG):
+    def __init__(self, log_level=logging.DEBUG, reader=None):
         """
         Initiates a game object collecting all start-state instances for the contained items for pre-game.
         Also sets up basic logging.
+        :param log_level: The bot log level
+        :param reader: Where to read engine input from, a FrameReader on stdin by default
         """
         self.turn_number = 0
+        self.turn_started = None
+        self._reader = reader if reader is not None else FrameReader()
 
         # Grab constants JSON
-        raw_constants = read_input()
-        constants.load_constants(json.loads(raw_constants))
+        constants.load_constants(self._reader.read_constants())
 
-        num_players, self.my_id = map(int, read_input().split())
+        num_players, self.my_id = self._reader.read_header()
 
+        if os.environ.get(NO_LOG_VARIABLE):
+            # basicConfig does nothing once the root logger has a handler
+            logging.getLogger().addHandler(logging.NullHandler())
         logging.basicConfig(
             filename="bot-{}.log".format(self.my_id),
             filemode="w",
             level=log_level,
         )
 
+        # Every player's ships, in parallel arrays
+        self.store = EntityStore()
+
         self.players = {}
-        for player in range(num_players):
-            self.players[player] = Player._generate()
+        for player, shipyard_x, shipyard_y in self._reader.read_players(num_players):
+            self.players[player] = Player._generate(player, shipyard_x, shipyard_y, self.store)
         self.me = self.players[self.my_id]
-        self.game_map = GameMap._generate()
+        self.game_map = GameMap._generate(*self._reader.read_map())
 
         constants.set_dimensions(self.game_map.width, self.game_map.height)
 
+        # Shipyards are read before the map, so swap in their interned positions
+        for player in self.players.values():
+            player.shipyard.position = Position(player.shipyard.position.x, player.shipyard.position.y)
+
     def ready(self, name):
         """
         Indicate that your bot is ready to play.
@@ -45,29 +65,35 @@ class Game:
         """
         send_commands([name])
 
+    @timing.timed("Game.update_frame")
     def update_frame(self):
         """
         Updates the game object's state.
         :returns: nothing.
         """
-        self.turn_number = int(read_input())
+        frame = self._reader.read_turn(len(self.players))
+        snapshots.record_frame(frame)
+        self.turn_number = frame.turn_number
+        eventlog.turn_number = self.turn_number
         logging.info("=============== TURN {:03} ================".format(self.turn_number))
 
-        for _ in range(len(self.players)):
-            player, num_ships, num_dropoffs, halite = map(int, read_input().split())
-            self.players[player]._update(num_ships, num_dropoffs, halite)
+        for player in frame.players:
+            self.players[player.id]._update(player.halite, player.ships, player.dropoffs)
 
-        self.game_map._update()
+        self.game_map._update(frame.cells)
 
         # Mark cells with ships as unsafe for navigation
         for player in self.players.values():
             for ship in player.get_ships():
-                self.game_map[ship.position].mark_unsafe(ship)
+                self.game_map._place_ship(ship.position.index, ship)
 
             self.game_map[player.shipyard.position].structure = player.shipyard
             for dropoff in player.get_dropoffs():
                 self.game_map[dropoff.position].structure = dropoff
 
+        # The turn's time budget is counted from here
+        self.turn_started = time.perf_counter()
+
     @staticmethod
     def end_turn(commands):
         """
@@ -76,6 +102,7 @@ class Game:
         :return: nothing.
         """
         send_commands(commands)
+        snapshots.record_commands(commands)
 
 
 def send_commands(commands):
@@ -1,17 +1,26 @@
-from .entity import Shipyard, Ship, Dropoff
+from collections import namedtuple
+
+from .entity import Shipyard, Dropoff
 from .positionals import Position
-from .common import read_input
+from .frames import records
+from .store import EntityStore
+
+"""What changed for a player in the latest frame: lists of spawned Ships, DestroyedShips, ShipMoves and new Dropoffs."""
+PlayerEvents = namedtuple('PlayerEvents', ['spawned', 'destroyed', 'moved', 'new_dropoffs'])
+
 
 class Player:
     """
     Player object containing all items/metadata pertinent to the player.
     """
-    def __init__(self, player_id, shipyard, halite=0):
+    def __init__(self, player_id, shipyard, halite=0, store=None):
         self.id = player_id
         self.shipyard = shipyard
         self.halite_amount = halite
+        self._store = store if store is not None else EntityStore()
         self._ships = {}
         self._dropoffs = {}
+        self.events = PlayerEvents([], [], [], [])
 
     def get_ship(self, ship_id):
         """
@@ -23,7 +32,7 @@ class Player:
 
     def get_ships(self):
         """
-        :return: Returns all ship objects in a list
+        :return: Returns all ship objects in a list, as views onto the game's EntityStore
         """
         return list(self._ships.values())
 
@@ -55,22 +64,35 @@ class Player:
 
 
     @staticmethod
-    def _generate():
+    def _generate(player, shipyard_x, shipyard_y, store=None):
         """
         Creates a player object from the input given by the game engine
+        :param player: The player id
+        :param shipyard_x: The x coordinate of the player's shipyard
+        :param shipyard_y: The y coordinate of the player's shipyard
+        :param store: The game's EntityStore, shared by every player
         :return: The player object
         """
-        player, shipyard_x, shipyard_y = map(int, read_input().split())
-        return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y, normalize=False)))
+        return Player(player, Shipyard(player, -1, Position(shipyard_x, shipyard_y, normalize=False)), store=store)
 
-    def _update(self, num_ships, num_dropoffs, halite):
+    def _update(self, halite, ships, dropoffs):
         """
         Updates this player object considering the input from the game engine for the current specific turn.
-        :param num_ships: The number of ships this player has this turn
-        :param num_dropoffs: The number of dropoffs this player has this turn
         :param halite: How much halite the player has in total
-        :return: nothing.
+        :param ships: Flat array of (id, x, y, halite) records for this player's ships
+        :param dropoffs: Flat array of (id, x, y) records for this player's dropoffs
+        :return: nothing. What changed since the previous frame is left in self.events.
         """
         self.halite_amount = halite
-        self._ships = {id: ship for (id, ship) in [Ship._generate(self.id) for _ in range(num_ships)]}
-        self._dropoffs = {id: dropoff for (id, dropoff) in [Dropoff._generate(self.id) for _ in range(num_dropoffs)]}
+        self._ships, changes = self._store.sync(self.id, ships)
+
+        # Dropoffs are never destroyed, so only new ids need building
+        new_dropoffs = []
+        if len(dropoffs) != len(self._dropoffs) * 3:
+            for dropoff in records(dropoffs, 3):
+                if dropoff[0] not in self._dropoffs:
+                    dropoff_id, dropoff = Dropoff._generate(self.id, *dropoff)
+                    self._dropoffs[dropoff_id] = dropoff
+                    new_dropoffs.append(dropoff)
+
+        self.events = PlayerEvents(changes.spawned, changes.destroyed, changes.moved, new_dropoffs)
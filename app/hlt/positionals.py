@@ -28,17 +28,9 @@ class Direction:
         :param direction: the direction in this notation
         :return: The character equivalent for the game engine
         """
-        if direction == Direction.North:
-            return commands.NORTH
-        if direction == Direction.South:
-            return commands.SOUTH
-        if direction == Direction.East:
-            return commands.EAST
-        if direction == Direction.West:
-            return commands.WEST
-        if direction == Direction.Still:
-            return commands.STAY_STILL
-        else:
+        try:
+            return _CONVERTED[direction]
+        except KeyError:
             raise IndexError
 
     @staticmethod
@@ -48,31 +40,90 @@ class Direction:
         :param direction: The input direction
         :return: The opposite direction
         """
-        if direction == Direction.North:
-            return Direction.South
-        if direction == Direction.South:
-            return Direction.North
-        if direction == Direction.East:
-            return Direction.West
-        if direction == Direction.West:
-            return Direction.East
-        if direction == Direction.Still:
-            return Direction.Still
-        else:
+        try:
+            return _INVERTED[direction]
+        except KeyError:
             raise IndexError
 
 
-class Position:
-    def __init__(self, x, y, normalize=True):
-        self.x = x
-        self.y = y
+_CONVERTED = {
+    Direction.North: commands.NORTH,
+    Direction.South: commands.SOUTH,
+    Direction.East: commands.EAST,
+    Direction.West: commands.WEST,
+    Direction.Still: commands.STAY_STILL,
+}
+
+_INVERTED = {
+    Direction.North: Direction.South,
+    Direction.South: Direction.North,
+    Direction.East: Direction.West,
+    Direction.West: Direction.East,
+    Direction.Still: Direction.Still,
+}
+
+# Slot in Position._neighbours for each direction, in tuple or engine notation
+_NEIGHBOUR_SLOTS = {
+    Direction.North: 0, commands.NORTH: 0,
+    Direction.South: 1, commands.SOUTH: 1,
+    Direction.East: 2, commands.EAST: 2,
+    Direction.West: 3, commands.WEST: 3,
+    Direction.Still: 4, commands.STAY_STILL: 4,
+}
+
+# The map grid whose interned positions are handed out, see set_grid
+_grid = None
+
+
+def set_grid(torus):
+    """
+    Intern positions on the given map grid from now on.
+    :param torus: The Torus of the map being played
+    """
+    global _grid
+    _grid = torus
 
-        if normalize:
-            self.normalize()
 
-    def normalize(self):
-        self.x = self.x % constants.WIDTH
-        self.y = self.y % constants.HEIGHT
+class Position:
+    """
+    An immutable map coordinate.
+
+    Once a map grid is set, every in-bounds position is interned: there is
+    one instance per cell, carrying its flat cell index and references to
+    its neighbouring positions, so offsets are lookups rather than new
+    objects. Positions outside the map bounds (only made with
+    normalize=False) are plain, uninterned instances.
+    """
+    __slots__ = ('x', 'y', 'index', '_hash', '_neighbours')
+
+    def __new__(cls, x, y, normalize=True):
+        grid = _grid
+        if grid is not None:
+            if normalize or (0 <= x < grid.width and 0 <= y < grid.height):
+                return grid.positions[(y % grid.height) * grid.width + x % grid.width]
+        elif normalize:
+            x = x % constants.WIDTH
+            y = y % constants.HEIGHT
+        return cls._create(x, y)
+
+    @classmethod
+    def _create(cls, x, y, index=None):
+        """
+        Builds a new instance, bypassing interning. Used by the map grid to build its positions.
+        """
+        position = object.__new__(cls)
+        object.__setattr__(position, 'x', x)
+        object.__setattr__(position, 'y', y)
+        object.__setattr__(position, 'index', index)
+        object.__setattr__(position, '_hash', hash((x, y)))
+        object.__setattr__(position, '_neighbours', None)
+        return position
+
+    def _link(self, neighbours):
+        """
+        Sets the interned (North, South, East, West, Still) neighbours of this position.
+        """
+        object.__setattr__(self, '_neighbours', neighbours)
 
     def directional_offset(self, direction):
         """
@@ -80,13 +131,18 @@ class Position:
         :param direction: the direction cardinal tuple
         :return: a new position moved in that direction
         """
-        return self + Position(*direction)
+        slot = _NEIGHBOUR_SLOTS.get(direction)
+        if slot is None or self._neighbours is None:
+            return self + Position(*direction, normalize=False)
+        return self._neighbours[slot]
 
     def get_surrounding_cardinals(self):
         """
         :return: Returns a list of all positions around this specific position in each cardinal direction
         """
-        return [self.directional_offset(current_direction) for current_direction in Direction.get_all_cardinals()]
+        if self._neighbours is None:
+            return [self.directional_offset(current_direction) for current_direction in Direction.get_all_cardinals()]
+        return list(self._neighbours[:4])
 
     def __add__(self, other):
         return Position(self.x + other.x, self.y + other.y)
@@ -94,23 +150,17 @@ class Position:
     def __sub__(self, other):
         return Position(self.x - other.x, self.y - other.y)
 
-    def __iadd__(self, other):
-        self.x += other.x
-        self.y += other.y
-        self.normalize()
-        return self
-
-    def __isub__(self, other):
-        self.x -= other.x
-        self.y -= other.y
-        self.normalize()
-        return self
-
     def __abs__(self):
         return Position(abs(self.x), abs(self.y))
 
+    def __setattr__(self, name, value):
+        raise AttributeError("Position is immutable")
+
+    def __reduce__(self):
+        return Position, (self.x, self.y, False)
+
     def __eq__(self, other):
-        return self.x == other.x and self.y == other.y
+        return self is other or (self.x == other.x and self.y == other.y)
 
     def __ne__(self, other):
         return not self.__eq__(other)
@@ -121,4 +171,4 @@ class Position:
                                    self.y)
 
     def __hash__(self):
-        return hash((self.x, self.y))
+        return self._hash
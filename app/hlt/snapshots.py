@@ -0,0 +1,345 @@
+"""
+Compact binary snapshots of every turn, written off the turn hot path.
+
+Each turn the frame read from the engine (every player's energy, ships and
+dropoffs, and the cells whose halite changed) and the commands we sent are
+queued for a background thread, which packs them as little-endian int32s
+and appends them to a data file. The file opens with a header holding the
+map at the start of the game, and every KEYFRAME_INTERVAL turns the whole
+board after that turn is appended as a keyframe, so the board on any turn
+is its nearest keyframe with at most KEYFRAME_INTERVAL - 1 turns of halite
+deltas applied.
+
+Next to the data file an index file holds the int64 offset of each turn's
+record, and a keyframe file the int64 offset of each keyframe, each entry
+written once its record is, so SnapshotReader reaches any turn and its
+board in O(1) from the memory-mapped files, and a file cut short by a crash
+still reads up to the last whole turn. Enabled when HALITE_SNAPSHOT_DIR is
+set.
+
+Data file layout, all int32:
+    header: MAGIC, VERSION, width, height, number of players, our player id, keyframe interval,
+            (player id, shipyard x, shipyard y) per player, width * height halite
+    turn:   turn number, number of players, number of changed cells, command bytes,
+            per player (id, halite, number of ships, number of dropoffs,
+                        (id, x, y, halite) per ship, (id, x, y) per dropoff),
+            (x, y, halite) per changed cell,
+            the commands as newline separated UTF-8, padded to a multiple of 4 bytes
+    keyframe: width * height halite, after the turn before it
+"""
+import atexit
+import logging
+import mmap
+import os
+import queue
+import struct
+import sys
+import threading
+from array import array
+from collections import namedtuple
+
+from .frames import Frame, PlayerFrame, records
+
+
+# Directory to write snapshot files to, enables snapshots when set
+ENVIRONMENT_VARIABLE = "HALITE_SNAPSHOT_DIR"
+
+MAGIC = 0x504E5348  # "HSNP" read as a little-endian int32
+VERSION = 2
+
+# Turns between full-board keyframes, the most turns of deltas replayed to rebuild a board
+KEYFRAME_INTERVAL = 25
+
+_HEADER = struct.Struct('<7i')
+_TURN = struct.Struct('<4i')
+_PLAYER = struct.Struct('<4i')
+
+"""The start of a snapshot file: shipyards are (player id, x, y) tuples and halite the row-major initial map."""
+SnapshotHeader = namedtuple('SnapshotHeader', ['width', 'height', 'num_players', 'my_id', 'shipyards', 'halite'])
+
+"""One turn: frame is the hlt.frames.Frame we read, commands the list of commands we answered with."""
+Snapshot = namedtuple('Snapshot', ['frame', 'commands'])
+
+enabled = False
+_writer = None
+_frame = None
+_registered = False
+
+
+def _int32s(values):
+    # Little-endian bytes of an int32 array
+    if sys.byteorder != 'little' or not isinstance(values, array) or values.typecode != 'i':
+        values = array('i', values)
+        if sys.byteorder != 'little':
+            values.byteswap()
+    return values.tobytes()
+
+
+def _from_int32s(buffer, offset, count):
+    values = array('i')
+    values.frombytes(buffer[offset:offset + 4 * count])
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def encode_turn(frame, commands):
+    """
+    :param frame: The turn's Frame
+    :param commands: The commands sent for the turn
+    :return: The turn record as bytes
+    """
+    text = "\n".join(commands).encode()
+    parts = [_TURN.pack(frame.turn_number, len(frame.players), len(frame.cells) // 3, len(text))]
+    for player in frame.players:
+        parts.append(_PLAYER.pack(player.id, player.halite, len(player.ships) // 4, len(player.dropoffs) // 3))
+        parts.append(_int32s(player.ships))
+        parts.append(_int32s(player.dropoffs))
+    parts.append(_int32s(frame.cells))
+    parts.append(text + bytes(-len(text) % 4))
+    return b''.join(parts)
+
+
+def decode_turn(buffer, offset):
+    """
+    :param buffer: The data file contents
+    :param offset: Where the turn record starts
+    :return: The Snapshot
+    """
+    turn_number, num_players, num_cells, num_bytes = _TURN.unpack_from(buffer, offset)
+    offset += _TURN.size
+    players = []
+    for _ in range(num_players):
+        player, halite, num_ships, num_dropoffs = _PLAYER.unpack_from(buffer, offset)
+        offset += _PLAYER.size
+        ships = _from_int32s(buffer, offset, 4 * num_ships)
+        offset += 16 * num_ships
+        dropoffs = _from_int32s(buffer, offset, 3 * num_dropoffs)
+        offset += 12 * num_dropoffs
+        players.append(PlayerFrame(player, halite, ships, dropoffs))
+    cells = _from_int32s(buffer, offset, 3 * num_cells)
+    offset += 12 * num_cells
+    text = bytes(buffer[offset:offset + num_bytes]).decode()
+    return Snapshot(Frame(turn_number, players, cells), text.split("\n") if text else [])
+
+
+class SnapshotWriter:
+    """
+    Appends turn records to a snapshot file from a background thread.
+
+    The turn loop only puts the frame and commands on a queue; packing,
+    writing and flushing happen on the writer thread, which also keeps the
+    board up to date with each turn's deltas for the keyframes.
+    """
+    def __init__(self, path, game, keyframe_interval=KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._data = open(path, "wb")
+        self._index = open(path + ".idx", "wb")
+        self._keys = open(path + ".key", "wb")
+        self._offset = 0
+        self._turns = 0
+        self._width = game.game_map.width
+        self._halite = array('i', game.game_map.halite)
+        self._queue = queue.Queue()
+        self._append(self._encode_header(game, keyframe_interval))
+
+        self._thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _encode_header(game, keyframe_interval):
+        game_map = game.game_map
+        players = sorted(game.players.values(), key=lambda player: player.id)
+        parts = [_HEADER.pack(MAGIC, VERSION, game_map.width, game_map.height, len(players), game.my_id,
+                              keyframe_interval)]
+        shipyards = array('i')
+        for player in players:
+            shipyards.extend((player.id, player.shipyard.position.x, player.shipyard.position.y))
+        parts.append(_int32s(shipyards))
+        parts.append(_int32s(game_map.halite))
+        return b''.join(parts)
+
+    def _append(self, data):
+        self._data.write(data)
+        self._offset += len(data)
+
+    def put(self, frame, commands):
+        """
+        Queue a turn to be written.
+        """
+        self._queue.put((frame, list(commands)))
+
+    def _write(self, index, data):
+        offset = self._offset
+        self._append(data)
+        self._data.flush()
+        # The index entry only goes in once the whole record is on disk
+        index.write(struct.pack('<q', offset))
+        index.flush()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                frame = item[0]
+                self._write(self._index, encode_turn(*item))
+                halite = self._halite
+                width = self._width
+                for x, y, amount in records(frame.cells, 3):
+                    halite[y * width + x] = amount
+                if self._turns % self.keyframe_interval == 0:
+                    self._write(self._keys, _int32s(halite))
+                self._turns += 1
+            except (OSError, ValueError, struct.error) as error:
+                logging.warning(f"Snapshot writer stopped: {error!r}")
+                break
+
+    def close(self):
+        """
+        Write out everything queued and close the files.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        self._data.close()
+        self._index.close()
+        self._keys.close()
+
+
+def enable(path, game):
+    """
+    Start snapshotting turns to a file, path.idx holding the turn index and path.key the keyframe index.
+    :param path: The data file to write
+    :param game: The Game, for the header
+    """
+    global enabled, _writer, _registered
+    if _writer is not None:
+        _writer.close()
+    _writer = SnapshotWriter(path, game)
+    enabled = True
+    if not _registered:
+        atexit.register(finish)
+        _registered = True
+
+
+def enable_from_environment(game):
+    """
+    Enable snapshots if the HALITE_SNAPSHOT_DIR environment variable names a directory.
+    :param game: The Game, once its initial state is read
+    :return: The path being written to, or None
+    """
+    directory = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not directory:
+        return None
+    path = os.path.join(directory, "snapshot-bot-{}-{}.bin".format(game.my_id, os.getpid()))
+    enable(path, game)
+    return path
+
+
+def record_frame(frame):
+    """
+    Hold on to the turn's frame until its commands are sent. Called by Game.update_frame.
+    """
+    global _frame
+    if enabled:
+        _frame = frame
+
+
+def record_commands(commands):
+    """
+    Queue the held frame with the commands sent for it. Called by Game.end_turn.
+    """
+    global _frame
+    if enabled and _frame is not None:
+        _writer.put(_frame, commands)
+        _frame = None
+
+
+def finish():
+    """
+    Stop the writer, once everything queued is written. Runs at exit.
+    """
+    global enabled, _writer
+    if _writer is None:
+        return
+    enabled = False
+    _writer.close()
+    _writer = None
+
+
+class SnapshotReader:
+    """
+    Reads a snapshot file through mmap, any turn in O(1) via the index and keyframe files.
+    """
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as data_file:
+            self._data = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = self._read_index(path + ".idx")
+        self._keyframes = self._read_index(path + ".key")
+
+        magic, version, width, height, num_players, my_id, interval = _HEADER.unpack_from(self._data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} snapshot file")
+        self.keyframe_interval = interval
+        offset = _HEADER.size
+        shipyards = list(records(_from_int32s(self._data, offset, 3 * num_players), 3))
+        offset += 12 * num_players
+        self.header = SnapshotHeader(width, height, num_players, my_id, shipyards,
+                                     _from_int32s(self._data, offset, width * height))
+        self.first_turn = _TURN.unpack_from(self._data, self._offsets[0])[0] if self._offsets else 1
+
+    @staticmethod
+    def _read_index(path):
+        offsets = array('q')
+        with open(path, "rb") as index_file:
+            index = index_file.read()
+        offsets.frombytes(index[:len(index) - len(index) % 8])
+        if sys.byteorder != 'little':
+            offsets.byteswap()
+        return offsets
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def turns(self):
+        """
+        :return: The range of turn numbers held
+        """
+        return range(self.first_turn, self.first_turn + len(self._offsets))
+
+    def turn(self, turn_number):
+        """
+        :return: The Snapshot of a turn
+        """
+        entry = turn_number - self.first_turn
+        if not 0 <= entry < len(self._offsets):
+            raise IndexError(f"Turn {turn_number} not in snapshot {self.path}")
+        return decode_turn(self._data, self._offsets[entry])
+
+    def halite(self, turn_number):
+        """
+        The board as it was read on a turn, by applying the deltas since the nearest keyframe before it.
+        :return: The halite of every cell as a row-major array
+        """
+        entry = turn_number - self.first_turn
+        if entry >= len(self._offsets):
+            raise IndexError(f"Turn {turn_number} not in snapshot {self.path}")
+        header = self.header
+        width = header.width
+        keyframe = min(entry // self.keyframe_interval, len(self._keyframes) - 1) if entry >= 0 else -1
+        if keyframe < 0:
+            halite = array('i', header.halite)
+            start = 0
+        else:
+            halite = _from_int32s(self._data, self._keyframes[keyframe], width * header.height)
+            start = keyframe * self.keyframe_interval + 1
+        for turn in range(self.first_turn + start, turn_number + 1):
+            for x, y, amount in records(self.turn(turn).frame.cells, 3):
+                halite[y * width + x] = amount
+        return halite
+
+    def close(self):
+        self._data.close()
@@ -0,0 +1,134 @@
+from array import array
+from collections import namedtuple
+
+from .entity import Ship, ShipStatus
+from .positionals import Position
+
+
+"""A ship that moved since the previous frame, origin being the Position it moved from."""
+ShipMove = namedtuple('ShipMove', ['ship', 'origin'])
+
+"""A ship missing from its owner's frame, as last seen. The ship's view is no longer valid."""
+DestroyedShip = namedtuple('DestroyedShip', ['owner', 'id', 'position', 'halite_amount'])
+
+"""How a player's ships changed in a frame: lists of Ship views, DestroyedShips and ShipMoves."""
+FleetChanges = namedtuple('FleetChanges', ['spawned', 'destroyed', 'moved'])
+
+
+class EntityStore:
+    """
+    Every live ship in a game, kept as parallel arrays indexed by slot.
+
+    A slot holds one ship from the turn it is first seen until the turn it
+    is missing from its owner's frame, after which the slot is freed and
+    reused by the next new ship. The arrays therefore only grow to the most
+    ships alive at once, however long the game. Ship objects handed out are
+    views reading and writing their slot, and are only valid while the ship
+    is alive.
+    """
+    def __init__(self):
+        self.ids = array('i')
+        self.owners = array('i')
+        self.xs = array('i')
+        self.ys = array('i')
+        self.cargo = array('i')
+        self.status = []
+        self.alive = array('b')
+
+        self._views = []
+        self._free = []
+        self._slots = {}
+        self._fleets = {}
+
+    def __len__(self):
+        return len(self._slots)
+
+    def slot_of(self, ship_id):
+        """
+        :return: The slot holding a live ship, or None
+        """
+        return self._slots.get(ship_id)
+
+    def live_slots(self, owner=None):
+        """
+        :param owner: Only return the slots of this player's ships, or None for every player
+        :return: A list of the slots of live ships
+        """
+        if owner is None:
+            return [slot for slot, alive in enumerate(self.alive) if alive]
+        return [ship._slot for ship in self._fleets.get(owner, {}).values()]
+
+    def _allocate(self, owner, ship_id):
+        if self._free:
+            slot = self._free.pop()
+            self.ids[slot] = ship_id
+            self.owners[slot] = owner
+            self.status[slot] = ShipStatus.GATHER
+            self.alive[slot] = 1
+        else:
+            slot = len(self.ids)
+            self.ids.append(ship_id)
+            self.owners.append(owner)
+            self.xs.append(0)
+            self.ys.append(0)
+            self.cargo.append(0)
+            self.status.append(ShipStatus.GATHER)
+            self.alive.append(1)
+            self._views.append(None)
+
+        self._views[slot] = Ship(self, slot)
+        self._slots[ship_id] = slot
+        return self._views[slot]
+
+    def _evict(self, ship):
+        slot = ship._slot
+        del self._slots[ship.id]
+        self.alive[slot] = 0
+        self.ids[slot] = -1
+        self.owners[slot] = -1
+        self._views[slot] = None
+        self._free.append(slot)
+
+    def sync(self, owner, ships):
+        """
+        Bring a player's ships up to date with a frame, adding new ships and evicting missing ones.
+        The player's ship dict is updated in place, so unchanged ships cost one comparison each.
+        :param owner: The player id
+        :param ships: Flat array of (id, x, y, halite) records for the player's ships
+        :return: The player's ships as a dict of ship id -> Ship view, and the FleetChanges
+        """
+        fleet = self._fleets.setdefault(owner, {})
+        spawned = []
+        moved = []
+        seen = set()
+        xs = self.xs
+        ys = self.ys
+        cargo = self.cargo
+        for entry in range(0, len(ships), 4):
+            ship_id = ships[entry]
+            x = ships[entry + 1]
+            y = ships[entry + 2]
+            seen.add(ship_id)
+            ship = fleet.get(ship_id)
+            if ship is None:
+                ship = self._allocate(owner, ship_id)
+                fleet[ship_id] = ship
+                spawned.append(ship)
+                slot = ship._slot
+            else:
+                slot = ship._slot
+                if xs[slot] != x or ys[slot] != y:
+                    moved.append(ShipMove(ship, Position(xs[slot], ys[slot])))
+            xs[slot] = x
+            ys[slot] = y
+            cargo[slot] = ships[entry + 3]
+
+        destroyed = []
+        if len(seen) < len(fleet):
+            for ship_id in [ship_id for ship_id in fleet if ship_id not in seen]:
+                ship = fleet.pop(ship_id)
+                slot = ship._slot
+                destroyed.append(DestroyedShip(owner, ship_id, Position(xs[slot], ys[slot]), cargo[slot]))
+                self._evict(ship)
+
+        return fleet, FleetChanges(spawned, destroyed, moved)
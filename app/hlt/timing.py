@@ -0,0 +1,188 @@
+"""
+Lightweight timing spans for the turn hot path.
+
+Wrap code in `with timing.span("name"):`, or decorate a whole function
+with `@timing.timed("name")`. While timing is disabled (the default) span
+returns a shared no-op context and timed functions go straight through,
+so instrumented code costs next to nothing. Once enabled, finished spans
+are buffered in memory, written out as one JSON line per turn by flush,
+and summarised as p50/p95/p99 per span name when the game ends.
+"""
+import atexit
+import functools
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+
+
+# Directory to write timing files to, enables timing when set
+ENVIRONMENT_VARIABLE = "HALITE_TIMING_DIR"
+
+enabled = False
+_output = None
+_spans = []
+_durations = defaultdict(list)
+_registered = False
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        _spans.append((self.name, time.perf_counter() - self.start))
+        return False
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name):
+    """
+    Times the enclosed block under a name.
+    :param name: The span name, e.g. "GameMap._update"
+    :return: A context manager
+    """
+    if not enabled:
+        return _NO_SPAN
+    return _Span(name)
+
+
+def timed(name):
+    """
+    Decorator timing every call of a function as a span.
+    :param name: The span name
+    """
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _spans.append((name, time.perf_counter() - start))
+        return wrapper
+    return decorator
+
+
+def record(name, seconds):
+    """
+    Record a span timed some other way, e.g. before timing was enabled.
+    :param name: The span name
+    :param seconds: How long it took
+    """
+    if enabled:
+        _spans.append((name, seconds))
+
+
+def enable(path):
+    """
+    Start recording spans, writing them to a JSONL file.
+    :param path: The file to write to
+    """
+    global enabled, _output, _registered
+    if _output is not None:
+        _output.close()
+    _output = open(path, "w")
+    enabled = True
+    if not _registered:
+        atexit.register(finish)
+        _registered = True
+
+
+def enable_from_environment(player_id):
+    """
+    Enable timing if the HALITE_TIMING_DIR environment variable names a directory.
+    :param player_id: Our player id, used in the file name
+    :return: The path being written to, or None
+    """
+    directory = os.environ.get(ENVIRONMENT_VARIABLE)
+    if not directory:
+        return None
+    path = os.path.join(directory, "timing-bot-{}-{}.jsonl".format(player_id, os.getpid()))
+    enable(path)
+    return path
+
+
+def flush(turn_number):
+    """
+    Write the spans recorded this turn as one JSON line and clear the buffer.
+    :param turn_number: The turn the spans belong to
+    """
+    global _spans
+    if not enabled or not _spans:
+        return
+
+    spans = _spans
+    _spans = []
+    for name, duration in spans:
+        _durations[name].append(duration)
+    _output.write(json.dumps({
+        "turn": turn_number,
+        "spans": [[name, round(duration * 1e6)] for name, duration in spans],
+    }) + "\n")
+
+
+def percentile(ordered, fraction):
+    """
+    Nearest rank percentile of an already sorted list.
+    :param ordered: The sorted values
+    :param fraction: The percentile as a fraction, e.g. 0.95
+    :return: The value at that rank, or NaN for an empty list
+    """
+    if not ordered:
+        return float('nan')
+    return ordered[min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))]
+
+
+def summary():
+    """
+    :return: {span name: {"count", "p50", "p95", "p99", "max"}}, times in microseconds
+    """
+    result = {}
+    for name, durations in _durations.items():
+        ordered = sorted(durations)
+        result[name] = {
+            "count": len(ordered),
+            "p50": round(percentile(ordered, 0.50) * 1e6),
+            "p95": round(percentile(ordered, 0.95) * 1e6),
+            "p99": round(percentile(ordered, 0.99) * 1e6),
+            "max": round(ordered[-1] * 1e6),
+        }
+    return result
+
+
+def finish():
+    """
+    Flush anything outstanding and write the per-span summary as the last line. Runs at exit.
+    """
+    global enabled, _output
+    if _output is None:
+        return
+    flush(None)
+    result = summary()
+    _output.write(json.dumps({"summary": result}) + "\n")
+    _output.close()
+    _output = None
+    enabled = False
+    logging.info(f"Timing summary (usec): {result}")
@@ -0,0 +1,178 @@
+from array import array
+
+from .positionals import _NEIGHBOUR_SLOTS, Direction, Position
+
+
+# Columns of the neighbour table, the same order Position links its neighbours in
+NORTH, SOUTH, EAST, WEST, STILL = range(5)
+NEIGHBOURS = 5
+
+# The slot of the move back onto a cell from each neighbour
+OPPOSITE = (SOUTH, NORTH, WEST, EAST, STILL)
+
+
+class Torus:
+    """
+    Distance and direction lookup tables for a toroidal map of a given size.
+
+    Cells are addressed by their flat row-major index (y * width + x), the
+    same layout as the GameMap board arrays. Tables are built once per map
+    size, so use Torus.get rather than constructing one directly.
+
+    neighbours is an (N, 5) table, flattened row-major, of the flat index
+    of every cell's (North, South, East, West, Still) neighbours, so graph
+    searches and collision checks can step between cells on integers
+    alone; moves holds the same rows as tuples, for loops over a cell's
+    neighbours.
+
+    The Torus also owns the interned Position of every cell, see
+    positionals.set_grid.
+    """
+    _cache = {}
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.size = width * height
+
+        # The x and y coordinate of every flat index
+        self.xs = array('i', [index % width for index in range(self.size)])
+        self.ys = array('i', [index // width for index in range(self.size)])
+
+        # Wrap-around distance for an absolute coordinate difference
+        self.x_distance = array('i', [min(delta, width - delta) for delta in range(width)])
+        self.y_distance = array('i', [min(delta, height - delta) for delta in range(height)])
+
+        # Closest moves for a signed coordinate difference, indexed by (target - source) + length
+        self._x_moves = [self._closest_moves(delta, width, Direction.East, Direction.West)
+                         for delta in range(-width, width)]
+        self._y_moves = [self._closest_moves(delta, height, Direction.South, Direction.North)
+                         for delta in range(-height, height)]
+
+        # Neighbour indices of every cell, one row per cell
+        self.neighbours = array('i')
+        for index, (x, y) in enumerate(zip(self.xs, self.ys)):
+            row = index - x
+            self.neighbours.extend(((index - width) % self.size,
+                                    (index + width) % self.size,
+                                    row + (x + 1) % width,
+                                    row + (x - 1) % width,
+                                    index))
+        self.moves = list(zip(*[iter(self.neighbours)] * NEIGHBOURS))
+
+        # One interned position per cell, linked to its neighbours
+        self.positions = [Position._create(x, y, index)
+                          for index, (x, y) in enumerate(zip(self.xs, self.ys))]
+        positions = self.positions
+        for position, moves in zip(positions, self.moves):
+            position._link(tuple(positions[neighbour] for neighbour in moves))
+
+    @staticmethod
+    def get(width, height):
+        """
+        Returns the lookup tables for a map size, building them on first use.
+        :param width: The map width
+        :param height: The map height
+        :return: The Torus for that map size
+        """
+        key = (width, height)
+        if key not in Torus._cache:
+            Torus._cache[key] = Torus(width, height)
+        return Torus._cache[key]
+
+    @staticmethod
+    def _closest_moves(delta, length, forward, backward):
+        if delta == 0:
+            return ()
+        cardinality = forward if delta > 0 else backward
+        return (cardinality if abs(delta) < (length / 2) else Direction.invert(cardinality),)
+
+    def index(self, x, y):
+        """
+        :return: The flat index of a coordinate pair, accounting for wrap-around
+        """
+        return (y % self.height) * self.width + x % self.width
+
+    def neighbour(self, index, direction):
+        """
+        :param index: A flat index
+        :param direction: A Direction, or a move command letter
+        :return: The flat index of the cell one move away
+        """
+        return self.neighbours[NEIGHBOURS * index + _NEIGHBOUR_SLOTS[direction]]
+
+    def neighbours_of(self, indices, direction):
+        """
+        The cells one move away from many cells, all in the same direction.
+        :param indices: An iterable of flat indices
+        :param direction: A Direction, or a move command letter
+        :return: A list of flat indices, in the order of indices
+        """
+        neighbours = self.neighbours
+        slot = _NEIGHBOUR_SLOTS[direction]
+        return [neighbours[NEIGHBOURS * index + slot] for index in indices]
+
+    def adjacent(self, indices):
+        """
+        The cells one move away from any of many cells.
+        :param indices: An iterable of flat indices
+        :return: A set of the flat indices of their cardinal neighbours
+        """
+        moves = self.moves
+        adjacent = set()
+        for index in indices:
+            adjacent.update(moves[index][:STILL])
+        return adjacent
+
+    def distance(self, source, target):
+        """
+        Manhattan distance between two flat indices, accounting for wrap-around.
+        """
+        xs = self.xs
+        ys = self.ys
+        return self.x_distance[abs(xs[source] - xs[target])] + self.y_distance[abs(ys[source] - ys[target])]
+
+    def distances(self, source, targets):
+        """
+        Manhattan distances from one flat index to many.
+        :param source: The source index
+        :param targets: An iterable of target indices
+        :return: A list of distances, in the order of targets
+        """
+        xs = self.xs
+        ys = self.ys
+        x_distance = self.x_distance
+        y_distance = self.y_distance
+        source_x = xs[source]
+        source_y = ys[source]
+        return [x_distance[abs(source_x - xs[target])] + y_distance[abs(source_y - ys[target])]
+                for target in targets]
+
+    def distance_matrix(self, sources, targets):
+        """
+        Manhattan distances from many flat indices to many.
+        :param sources: An iterable of source indices
+        :param targets: A sequence of target indices
+        :return: A list of rows, one per source, each holding the distances to every target
+        """
+        return [self.distances(source, targets) for source in sources]
+
+    def closest(self, source, targets):
+        """
+        :param source: The source index
+        :param targets: A non-empty sequence of target indices
+        :return: The (distance, target) pair of the closest target, ties going to the earliest
+        """
+        distances = self.distances(source, targets)
+        best = min(range(len(distances)), key=distances.__getitem__)
+        return distances[best], targets[best]
+
+    def directions(self, source, target):
+        """
+        The Direction(s) that move source closer to target, x move first.
+        Empty if both indices are the same.
+        """
+        xs = self.xs
+        ys = self.ys
+        return list(self._x_moves[xs[target] - xs[source] + self.width]
+                    + self._y_moves[ys[target] - ys[source] + self.height])
@@ -0,0 +1,42 @@
+from hlt.positionals import set_grid
+from hlt.torus import Torus
+
+from engine.dropoffs import DropoffField
+
+
+def test_field_matches_brute_force_with_ties_to_the_earliest_dropoff():
+    torus = Torus.get(12, 7)
+    set_grid(torus)
+    # The second and third dropoffs are equally far from many cells, and the last repeats the first
+    sources = [torus.index(1, 1), torus.index(5, 4), torus.index(9, 4), torus.index(1, 1)]
+    field = DropoffField(torus)
+    assert field.update(sources)
+    assert not field.update(sources)
+
+    for index in range(torus.size):
+        distances = [torus.distance(index, source) for source in sources]
+        closest = min(distances)
+        assert field.distance[index] == closest
+        assert field.nearest[index] == sources[distances.index(closest)]
+        assert field.nearest_position(index).index == field.nearest[index]
+
+        # Following the next steps walks straight to the nearest dropoff
+        cell = index
+        for remaining in range(closest, 0, -1):
+            step = field.next_index(cell)
+            assert step == field.torus.positions[cell].directional_offset(field.next_move(cell)).index
+            assert field.distance[step] == remaining - 1
+            cell = step
+        assert cell == field.nearest[index]
+        assert field.next_index(cell) == cell
+
+
+def test_rebuilt_when_dropoffs_change():
+    torus = Torus.get(12, 7)
+    set_grid(torus)
+    field = DropoffField(torus)
+    field.update([torus.index(0, 0)])
+    assert field.distance[torus.index(6, 3)] == 9
+    assert field.update([torus.index(0, 0), torus.index(6, 4)])
+    assert field.distance[torus.index(6, 3)] == 1
+    assert field.nearest[torus.index(6, 3)] == torus.index(6, 4)
@@ -0,0 +1,27 @@
+import logging
+
+from hlt import eventlog
+
+
+def record_turns(monkeypatch, turns):
+    monkeypatch.setattr(eventlog, "_installed", True)
+    monkeypatch.setattr(eventlog, "_events", eventlog.collections.deque(maxlen=eventlog.CAPACITY))
+    for turn in range(1, turns + 1):
+        monkeypatch.setattr(eventlog, "turn_number", turn)
+        eventlog.record("Ship {} at turn {}", 0, turn)
+
+
+def test_game_end_dump_writes_only_the_last_turns(monkeypatch, caplog):
+    record_turns(monkeypatch, 12)
+    with caplog.at_level(logging.INFO):
+        eventlog.dump(3)
+    assert caplog.messages == ["[turn 010] Ship 0 at turn 10", "[turn 011] Ship 0 at turn 11",
+                               "[turn 012] Ship 0 at turn 12"]
+    assert not eventlog._events
+
+
+def test_error_dump_writes_everything(monkeypatch, caplog):
+    record_turns(monkeypatch, 4)
+    with caplog.at_level(logging.INFO):
+        eventlog.dump()
+    assert len(caplog.messages) == 4
@@ -0,0 +1,13 @@
+from types import SimpleNamespace
+
+from hlt import eventlog
+from hlt.positionals import Direction
+
+from executors.hlt_alpha.processor import TurnProcessor
+
+
+def test_move_commands_match_ship_move_without_logging():
+    moves = [(SimpleNamespace(id=3), Direction.North), (SimpleNamespace(id=12), Direction.Still)]
+    recorded = len(eventlog._events)
+    assert TurnProcessor.move_commands(moves) == ["m 3 n", "m 12 o"]
+    assert len(eventlog._events) == recorded
@@ -0,0 +1,103 @@
+import json
+
+import pytest
+
+from hlt import commands
+
+from tools import replays
+from tools.simulator import DEFAULT_CONSTANTS
+
+
+WIDTH = 4
+HEIGHT = 3
+
+
+def make_replay_data():
+    grid = [[{'energy': 10 * (y * WIDTH + x)} for x in range(WIDTH)] for y in range(HEIGHT)]
+    frames = [
+        {'cells': [], 'entities': {}, 'energy': {'0': 5000, '1': 5000},
+         'moves': {'0': [{'type': commands.GENERATE}], '1': []}, 'events': []},
+        {'cells': [{'x': 1, 'y': 0, 'production': 7}],
+         'entities': {'0': {'0': {'x': 0, 'y': 0, 'energy': 0}}},
+         'energy': {'0': 4000, '1': 5000},
+         'moves': {'0': [{'type': commands.MOVE, 'id': 0, 'direction': commands.EAST}], '1': []},
+         'events': []},
+        {'cells': [{'x': 1, 'y': 0, 'production': 5}, {'x': 3, 'y': 2, 'production': 1}],
+         'entities': {'0': {'0': {'x': 1, 'y': 0, 'energy': 2}}, '1': {'1': {'x': 3, 'y': 2, 'energy': 30}}},
+         'energy': {'0': 4000, '1': 4000},
+         'moves': {'0': [{'type': commands.CONSTRUCT, 'id': 0}], '1': []},
+         'events': [{'type': 'construct', 'owner_id': 0, 'id': 2, 'location': {'x': 1, 'y': 0}}]},
+    ]
+    return {
+        'GAME_CONSTANTS': dict(DEFAULT_CONSTANTS, MAX_TURNS=len(frames)),
+        'map_generator_seed': 42,
+        'number_of_players': 2,
+        'players': [{'name': 'a', 'factory_location': {'x': 0, 'y': 0}},
+                    {'name': 'b', 'factory_location': {'x': 2, 'y': 2}}],
+        'production_map': {'width': WIDTH, 'height': HEIGHT, 'grid': grid},
+        'full_frames': frames,
+    }
+
+
+def check_replay(replay):
+    assert (replay.width, replay.height, replay.num_players, replay.seed, replay.turns) == (WIDTH, HEIGHT, 2, 42, 3)
+    assert replay.player_names == ['a', 'b']
+    assert replay.shipyards == [(0, 0), (2, 2)]
+    assert list(replay.frame_cells(2)) == [1, 5, 11, 1]
+    assert list(replay.frame_ships(2)) == [0, 0, 1, 0, 2, 1, 1, 3, 2, 30]
+    assert list(replay.frame_energy(1)) == [4000, 5000]
+    assert replay.player_commands(0, 0) == [commands.GENERATE]
+    assert replay.player_commands(1, 0) == ["m 0 e"]
+    assert replay.player_commands(2, 0) == ["c 0"]
+    assert replay.player_commands(2, 1) == []
+    assert replay.dropoffs == [replays.ReplayDropoff(2, 0, 2, 1, 0)]
+
+    grids = [(turn, list(halite)) for turn, halite in replay.halite_grids()]
+    assert grids[-1][0] == 2
+    assert grids[-1][1][1] == 5 and grids[-1][1][11] == 1 and grids[-1][1][2] == 20
+
+
+def check_games(replay, monkeypatch):
+    monkeypatch.setenv("HALITE_NO_BOT_LOG", "1")
+    games = replays.iter_games(replay, 0)
+    turn, game = next(games)
+    assert (turn, game.turn_number, game.me.halite_amount, len(game.me.get_ships())) == (0, 1, 5000, 0)
+    turn, game = next(games)
+    assert game.game_map.halite[1] == 7
+    assert [(ship.id, ship.position.x, ship.position.y) for ship in game.me.get_ships()] == [(0, 0, 0)]
+    turn, game = next(games)
+    assert game.turn_number == 3
+    assert game.game_map.halite[1] == 5
+    assert [(dropoff.id, dropoff.position.x) for dropoff in game.me.get_dropoffs()] == [(2, 1)]
+    assert [ship.halite_amount for ship in game.players[1].get_ships()] == [30]
+
+
+def test_round_trip_uncompressed(tmp_path, monkeypatch):
+    path = tmp_path / "replay.hlt"
+    path.write_bytes(json.dumps(make_replay_data()).encode())
+    replay = replays.load_replay(str(path))
+    check_replay(replay)
+    check_games(replay, monkeypatch)
+
+
+def test_round_trip_compressed(tmp_path, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "replay.hlt"
+    path.write_bytes(zstandard.ZstdCompressor().compress(json.dumps(make_replay_data()).encode()))
+    replay = replays.load_replay(str(path))
+    check_replay(replay)
+    check_games(replay, monkeypatch)
+
+
+def test_compressed_without_zstandard(tmp_path, monkeypatch):
+    monkeypatch.setattr(replays, "zstandard", None)
+    path = tmp_path / "replay.hlt"
+    path.write_bytes(replays._ZSTD_MAGIC + bytes(16))
+    with pytest.raises(ImportError):
+        replays.load_replay(str(path))
+    # Unreadable replays are skipped rather than stopping the walk, the missing package is not
+    good = tmp_path / "good.hlt"
+    good.write_bytes(json.dumps(make_replay_data()).encode())
+    bad = tmp_path / "bad.hlt"
+    bad.write_bytes(b"{")
+    assert [replay.path for replay in replays.iter_replays([str(bad), str(good)])] == [str(good)]
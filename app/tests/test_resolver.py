@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+from hlt.positionals import Direction, set_grid
+from hlt.torus import Torus
+
+from engine.resolver import resolve_moves
+
+
+def make_ships(width, height, *cells):
+    torus = Torus.get(width, height)
+    set_grid(torus)
+    return [SimpleNamespace(id=ship_id, position=torus.positions[torus.index(x, y)])
+            for ship_id, (x, y) in enumerate(cells)]
+
+
+def moves_of(resolution):
+    return [direction for _, direction in resolution.moves]
+
+
+def destinations(resolution):
+    return [ship.position.directional_offset(direction).index for ship, direction in resolution.moves]
+
+
+def test_swap():
+    a, b = make_ships(8, 6, (2, 2), (3, 2))
+    resolution = resolve_moves([(a, [Direction.East]), (b, [Direction.West])])
+    assert moves_of(resolution) == [Direction.East, Direction.West]
+
+
+def test_cycle_around_the_wrap():
+    ships = make_ships(3, 5, (0, 1), (1, 1), (2, 1))
+    resolution = resolve_moves([(ship, [Direction.East]) for ship in ships])
+    assert moves_of(resolution) == [Direction.East] * 3
+    assert sorted(destinations(resolution)) == sorted(ship.position.index for ship in ships)
+
+
+def test_blocked_cells_are_avoided():
+    ship, = make_ships(8, 6, (4, 4))
+    blocked = {ship.position.directional_offset(Direction.East).index}
+    resolution = resolve_moves([(ship, [Direction.East, Direction.North])], blocked)
+    assert moves_of(resolution) == [Direction.North]
+
+    resolution = resolve_moves([(ship, [Direction.East])], blocked)
+    assert moves_of(resolution) == [Direction.Still]
+
+
+def test_staying_ships_keep_their_cell():
+    still, mover = make_ships(8, 6, (1, 1), (2, 1))
+    resolution = resolve_moves([(mover, [Direction.West]), (still, [Direction.Still])])
+    assert moves_of(resolution) == [Direction.Still, Direction.Still]
+
+
+def test_contested_cell_goes_by_priority_and_loser_stays():
+    a, b = make_ships(8, 6, (1, 1), (3, 1))
+    resolution = resolve_moves([(a, [Direction.East]), (b, [Direction.West])])
+    assert moves_of(resolution) == [Direction.East, Direction.Still]
+
+
+def test_earlier_ship_is_pushed_onto_its_next_choice():
+    a, b, c = make_ships(8, 6, (1, 1), (3, 1), (4, 1))
+    # c moving into b's cell leaves b nowhere to go but a's best cell, so a takes its second choice
+    resolution = resolve_moves([(c, [Direction.West]),
+                                (a, [Direction.East, Direction.North]),
+                                (b, [Direction.West])])
+    assert moves_of(resolution) == [Direction.West, Direction.North, Direction.West]
+
+
+def test_no_two_ships_share_a_cell():
+    ships = make_ships(5, 4, *[(x, y) for y in range(4) for x in range(5) if (x + y) % 2])
+    everything = [Direction.North, Direction.South, Direction.East, Direction.West]
+    resolution = resolve_moves([(ship, everything) for ship in ships])
+    cells = destinations(resolution)
+    assert len(set(cells)) == len(cells) == len(ships)
+    assert set(resolution.claimed) == set(cells)
@@ -0,0 +1,50 @@
+import random
+from array import array
+
+from hlt.game_map import GameMap
+
+from engine.sites import SiteScorer
+
+
+def brute_force_sums(game_map, radius):
+    width = game_map.width
+    height = game_map.height
+    sums = []
+    for y in range(height):
+        for x in range(width):
+            sums.append(sum(game_map.halite[((y + dy) % height) * width + (x + dx) % width]
+                            for dy in range(-radius, radius + 1)
+                            for dx in range(-radius, radius + 1)))
+    return sums
+
+
+def make_map(width, height, seed):
+    rng = random.Random(seed)
+    halite = array('i', [rng.randrange(1000) for _ in range(width * height)])
+    return GameMap(halite, width, height, sum(halite)), rng
+
+
+def check(scorer, game_map):
+    scorer.update()
+    for radius, sums in zip(scorer.radii, scorer.sums):
+        assert list(sums) == brute_force_sums(game_map, radius)
+
+
+def test_window_sums_match_brute_force():
+    game_map, _ = make_map(21, 13, 1)
+    scorer = SiteScorer(game_map)
+    check(scorer, game_map)
+
+
+def test_incremental_updates_match_brute_force():
+    game_map, rng = make_map(24, 18, 2)
+    scorer = SiteScorer(game_map)
+    for changes in (1, 5, 3, 200):
+        for _ in range(3):
+            # Several turns of changes tracked before the sums are next read
+            game_map.changed_cells = rng.sample(range(game_map.torus.size), changes)
+            for index in game_map.changed_cells:
+                game_map.halite[index] = rng.randrange(1000)
+            scorer.track()
+        check(scorer, game_map)
+    assert not scorer.pending
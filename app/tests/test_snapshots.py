@@ -0,0 +1,77 @@
+import random
+from array import array
+from types import SimpleNamespace
+
+from hlt import snapshots
+from hlt.frames import Frame, PlayerFrame
+from hlt.snapshots import SnapshotReader, SnapshotWriter
+
+
+WIDTH = 8
+HEIGHT = 6
+
+
+def make_game(halite):
+    players = {player_id: SimpleNamespace(id=player_id, shipyard=SimpleNamespace(position=SimpleNamespace(x=x, y=y)))
+               for player_id, x, y in ((0, 2, 3), (1, 5, 3))}
+    game_map = SimpleNamespace(width=WIDTH, height=HEIGHT, halite=halite)
+    return SimpleNamespace(game_map=game_map, players=players, my_id=1)
+
+
+def make_turns(count, seed=0):
+    rng = random.Random(seed)
+    turns = []
+    for turn_number in range(1, count + 1):
+        cells = array('i')
+        for index in rng.sample(range(WIDTH * HEIGHT), rng.randrange(4)):
+            cells.extend((index % WIDTH, index // WIDTH, rng.randrange(1000)))
+        players = [PlayerFrame(0, 5000 - turn_number, array('i', [0, 2, 3, turn_number]), array('i')),
+                   PlayerFrame(1, 4000, array('i'), array('i', [7, 1, 1]))]
+        commands = ["m 0 n", "g"] if turn_number % 2 else []
+        turns.append((Frame(turn_number, players, cells), commands))
+    return turns
+
+
+def test_round_trip(tmp_path):
+    initial = array('i', range(WIDTH * HEIGHT))
+    turns = make_turns(12)
+    path = str(tmp_path / "game.bin")
+    writer = SnapshotWriter(path, make_game(array('i', initial)), keyframe_interval=4)
+    for frame, commands in turns:
+        writer.put(frame, commands)
+    writer.close()
+
+    reader = SnapshotReader(path)
+    try:
+        assert reader.header.width == WIDTH and reader.header.height == HEIGHT and reader.header.my_id == 1
+        assert reader.header.shipyards == [(0, 2, 3), (1, 5, 3)]
+        assert list(reader.header.halite) == list(initial)
+        assert list(reader.turns()) == list(range(1, 13))
+
+        halite = array('i', initial)
+        for frame, commands in turns:
+            snapshot = reader.turn(frame.turn_number)
+            assert snapshot.commands == commands
+            assert snapshot.frame.turn_number == frame.turn_number
+            assert [tuple(player) for player in snapshot.frame.players] == [tuple(player) for player in frame.players]
+            assert snapshot.frame.cells == frame.cells
+
+            for entry in range(0, len(frame.cells), 3):
+                x, y, amount = frame.cells[entry:entry + 3]
+                halite[y * WIDTH + x] = amount
+            assert reader.halite(frame.turn_number) == halite
+    finally:
+        reader.close()
+
+
+def test_enable_registers_exit_handler_once(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(snapshots, "_registered", False)
+    monkeypatch.setattr(snapshots.atexit, "register", registered.append)
+    game = make_game(array('i', [0] * (WIDTH * HEIGHT)))
+    try:
+        snapshots.enable(str(tmp_path / "first.bin"), game)
+        snapshots.enable(str(tmp_path / "second.bin"), game)
+    finally:
+        snapshots.finish()
+    assert registered == [snapshots.finish]
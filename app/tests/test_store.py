@@ -0,0 +1,29 @@
+from hlt.entity import Ship
+from hlt.store import EntityStore
+
+
+def test_ship_views_have_no_dict():
+    store = EntityStore()
+    ships, _ = store.sync(0, [3, 4, 5, 100])
+    ship = ships[3]
+    assert not hasattr(ship, '__dict__')
+    assert Ship.__dictoffset__ == 0
+    assert (ship.owner, ship.id, ship.position.x, ship.position.y, ship.halite_amount) == (0, 3, 4, 5, 100)
+
+
+def test_slots_are_recycled_and_liveness_tracked():
+    store = EntityStore()
+    store.sync(0, [1, 0, 0, 0, 2, 1, 1, 0])
+    store.sync(1, [3, 2, 2, 0])
+    assert sorted(store.live_slots()) == [0, 1, 2]
+
+    _, changes = store.sync(0, [2, 1, 2, 0])
+    assert [ship.id for ship in changes.destroyed] == [1]
+    assert sorted(store.live_slots()) == [1, 2]
+    assert store.slot_of(1) is None
+
+    _, changes = store.sync(1, [3, 2, 2, 0, 4, 5, 5, 0])
+    assert changes.spawned[0]._slot == 0
+    assert sorted(store.live_slots()) == [0, 1, 2]
+    assert store.live_slots(0) == [1]
+    assert len(store.ids) == 3
@@ -0,0 +1,23 @@
+import json
+
+from hlt import timing
+
+
+def test_enable_registers_exit_handler_once(tmp_path, monkeypatch):
+    registered = []
+    monkeypatch.setattr(timing, "_registered", False)
+    monkeypatch.setattr(timing.atexit, "register", registered.append)
+    monkeypatch.setattr(timing, "_durations", timing.defaultdict(list))
+    try:
+        timing.enable(str(tmp_path / "first.jsonl"))
+        timing.enable(str(tmp_path / "second.jsonl"))
+        with timing.span("turn"):
+            pass
+        timing.flush(1)
+    finally:
+        timing.finish()
+    assert registered == [timing.finish]
+
+    lines = [json.loads(line) for line in (tmp_path / "second.jsonl").read_text().splitlines()]
+    assert lines[0]["turn"] == 1 and lines[0]["spans"][0][0] == "turn"
+    assert lines[-1]["summary"]["turn"]["count"] == 1
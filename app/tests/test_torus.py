@@ -0,0 +1,34 @@
+from hlt.positionals import Direction, Position, set_grid
+from hlt.torus import NEIGHBOURS, Torus
+
+
+DIRECTIONS = (Direction.North, Direction.South, Direction.East, Direction.West, Direction.Still)
+
+
+def test_neighbour_table_matches_position_offsets():
+    torus = Torus.get(9, 5)
+    set_grid(torus)
+    assert len(torus.neighbours) == NEIGHBOURS * torus.size
+    for index in range(torus.size):
+        # A free-standing Position works the offset out arithmetically, independent of the table
+        position = Position._create(torus.xs[index], torus.ys[index])
+        for slot, direction in enumerate(DIRECTIONS):
+            expected = position.directional_offset(direction)
+            neighbour = torus.neighbours[NEIGHBOURS * index + slot]
+            assert (torus.xs[neighbour], torus.ys[neighbour]) == (expected.x, expected.y)
+            assert torus.neighbour(index, direction) == neighbour
+            assert torus.neighbour(index, Direction.convert(direction)) == neighbour
+            assert torus.moves[index][slot] == neighbour
+            assert torus.positions[index].directional_offset(direction) is torus.positions[neighbour]
+
+
+def test_vectorised_helpers_match_neighbour():
+    torus = Torus.get(9, 5)
+    set_grid(torus)
+    indices = [0, 8, 17, 36, 44, 22]
+    for direction in DIRECTIONS:
+        assert torus.neighbours_of(indices, direction) == [torus.neighbour(index, direction) for index in indices]
+    cardinals = DIRECTIONS[:4]
+    assert torus.adjacent(indices) == {torus.neighbour(index, direction)
+                                       for index in indices for direction in cardinals}
+    assert torus.adjacent([]) == set()
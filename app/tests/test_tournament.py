@@ -0,0 +1,42 @@
+import json
+from collections import defaultdict
+
+from tools.tournament import MAP_SIZES, PLAYER_COUNTS, MatchResult, SeatResult, _read_latencies, schedule, summarise
+
+
+def test_every_bot_takes_every_seat_in_every_configuration():
+    for num_bots in (2, 3, 4):
+        configurations = len(MAP_SIZES) * len(PLAYER_COUNTS)
+        matches = schedule(num_bots, configurations * num_bots, seed=7)
+        assert [match.seed for match in matches] == list(range(7, 7 + len(matches)))
+
+        seatings = defaultdict(lambda: defaultdict(set))
+        for match in matches:
+            for seat, bot in enumerate(match.seats):
+                seatings[match.size, len(match.seats)][seat].add(bot)
+        assert set(seatings) == {(size, players) for size in MAP_SIZES for players in PLAYER_COUNTS}
+        for (size, players), seats in seatings.items():
+            assert sorted(seats) == list(range(players))
+            for bots in seats.values():
+                assert bots == set(range(num_bots))
+
+
+def test_summarise_without_latencies():
+    matches = schedule(2, 2)
+    results = [MatchResult(match, [SeatResult(bot, player, player + 1, 100 - player, False, [])
+                                   for player, bot in enumerate(match.seats)], 1.0, None)
+               for match in matches]
+    rows = summarise(["a", "b"], results)
+    assert [(row["bot"], row["players"], row["games"], row["wins"]) for row in rows] == \
+        [("a", 2, 2, 2), ("a", "all", 2, 2), ("b", 2, 2, 0), ("b", "all", 2, 0)]
+    assert all(row["p50_ms"] != row["p50_ms"] for row in rows)
+
+
+def test_latencies_skip_the_startup_and_summary_lines(tmp_path):
+    lines = [{"turn": 0, "spans": [["startup.precompute", 40000]]},
+             {"turn": 1, "spans": [["Game.update_frame", 300], ["TurnProcessor.run", 1700], ["radar.scan", 50]]},
+             {"turn": 2, "spans": [["TurnProcessor.run", 1000]]},
+             {"summary": {}}]
+    (tmp_path / "timing-bot-1-99.jsonl").write_text("".join(json.dumps(line) + "\n" for line in lines))
+    assert _read_latencies(str(tmp_path), 1) == [0.002, 0.001]
+    assert _read_latencies(str(tmp_path), 0) == []
@@ -0,0 +1,5 @@
+"""
+Offline tooling for developing the bot: benchmarks, simulators and runners.
+
+Nothing in here is imported by the bot itself.
+"""
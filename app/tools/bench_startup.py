@@ -0,0 +1,79 @@
+"""
+Benchmark for the bot's import and pre-ready() startup time.
+
+Each measurement runs in a fresh interpreter, as a real game would: the
+import of the bot's modules, reading the pre-game input into a Game, and
+engine.precompute with an empty startup cache (building the tables) and
+again with the cache the first run left (loading them). Reports the
+median of several runs per map size.
+
+Usage (from the app directory):
+    python -m tools.bench_startup
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from engine.precompute import CACHE_VARIABLE
+from tools.bench_update_frame import build_input
+
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = (32, 48, 64)
+
+# Run in a fresh interpreter, printing the StartupReport as JSON
+_STARTUP = """
+import time
+started = time.perf_counter()
+import io, json, logging, sys
+import hlt, executors
+from hlt.frames import FrameReader
+from engine import precompute
+imported = time.perf_counter()
+logging.getLogger().addHandler(logging.NullHandler())
+game = hlt.Game(log_level=logging.WARN, reader=FrameReader(io.BytesIO(sys.stdin.buffer.read())))
+print(json.dumps(precompute.precompute(game, started, imported)._asdict()))
+"""
+
+
+def startup(data, cache_directory):
+    """
+    :return: The StartupReport of a fresh interpreter starting a game, as a dict
+    """
+    environment = dict(os.environ, **{CACHE_VARIABLE: cache_directory})
+    completed = subprocess.run([sys.executable, "-c", _STARTUP], input=data, stdout=subprocess.PIPE,
+                               cwd=APP_DIRECTORY, env=environment, check=True)
+    return json.loads(completed.stdout.decode())
+
+
+def main(repeats=5):
+    print("{:>6} {:>12} {:>12} {:>14} {:>14}".format("size", "imports ms", "game ms", "building ms", "loading ms"))
+    for size in SIZES:
+        data = build_input(size, 0, 0, 0, num_players=4).encode()
+        cold = []
+        warm = []
+        for _ in range(repeats):
+            cache_directory = tempfile.mkdtemp(prefix="halite-startup-")
+            try:
+                cold.append(startup(data, cache_directory))
+                warm.append(startup(data, cache_directory))
+            finally:
+                shutil.rmtree(cache_directory, ignore_errors=True)
+        if any(report["cached"] for report in cold) or not all(report["cached"] for report in warm):
+            print("{:>6} the startup cache was not used as expected".format(size))
+
+        def median(reports, name):
+            return statistics.median(report[name] for report in reports) * 1e3
+
+        print("{:>6} {:>12.1f} {:>12.1f} {:>14.1f} {:>14.1f}".format(
+            size, median(cold + warm, "imports"), median(cold + warm, "game"),
+            median(cold, "precompute"), median(warm, "precompute")))
+
+
+if __name__ == '__main__':
+    main()
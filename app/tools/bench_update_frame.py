@@ -0,0 +1,100 @@
+"""
+Benchmark for Game.update_frame.
+
+Feeds synthetic engine input for a range of board sizes and per-turn cell
+delta counts, and reports the mean parse/update cost per turn. The cost
+should follow the number of deltas and ships, not the board area.
+
+Also reports the cost of parsing the initial 64x64 map and of a 4 player turn.
+
+Usage (from the app directory):
+    python -m tools.bench_update_frame
+"""
+import io
+import json
+import logging
+import random
+import time
+
+import hlt
+from hlt.frames import FrameReader
+
+
+CONSTANTS = {
+    'NEW_ENTITY_ENERGY_COST': 1000, 'DROPOFF_COST': 4000, 'MAX_ENERGY': 1000, 'MAX_TURNS': 500,
+    'EXTRACT_RATIO': 4, 'MOVE_COST_RATIO': 10, 'INSPIRATION_ENABLED': True, 'INSPIRATION_RADIUS': 4,
+    'INSPIRATION_SHIP_COUNT': 2, 'INSPIRED_EXTRACT_RATIO': 4, 'INSPIRED_BONUS_MULTIPLIER': 2.0,
+    'INSPIRED_MOVE_COST_RATIO': 10,
+}
+
+
+def build_input(size, num_deltas, num_ships, num_turns, num_players=2, seed=0):
+    """
+    Builds the engine input for a game with a fixed number of cell deltas and ships per turn.
+    :return: The engine input as a single string
+    """
+    rng = random.Random(seed)
+    lines = [json.dumps(CONSTANTS), "{} 0".format(num_players)]
+    for player in range(num_players):
+        lines.append("{} {} {}".format(player, rng.randrange(size), rng.randrange(size)))
+    lines.append("{} {}".format(size, size))
+    for _ in range(size):
+        lines.append(" ".join(str(rng.randint(0, 1000)) for _ in range(size)))
+
+    for turn in range(1, num_turns + 1):
+        lines.append(str(turn))
+        for player in range(num_players):
+            lines.append("{} {} 0 5000".format(player, num_ships))
+            for ship in range(num_ships):
+                ship_id = player * num_ships + ship
+                lines.append("{} {} {} {}".format(ship_id, rng.randrange(size), rng.randrange(size),
+                                                  rng.randint(0, 1000)))
+        lines.append(str(num_deltas))
+        for _ in range(num_deltas):
+            lines.append("{} {} {}".format(rng.randrange(size), rng.randrange(size), rng.randint(0, 1000)))
+    return "\n".join(lines) + "\n"
+
+
+def time_update_frame(size, num_deltas, num_ships, num_turns=100, num_players=2):
+    """
+    :return: Mean seconds spent in Game.update_frame per turn
+    """
+    data = build_input(size, num_deltas, num_ships, num_turns, num_players).encode()
+    game = hlt.Game(log_level=logging.WARN, reader=FrameReader(io.BytesIO(data)))
+    start = time.perf_counter()
+    for _ in range(num_turns):
+        game.update_frame()
+    return (time.perf_counter() - start) / num_turns
+
+
+def time_initial_parse(size, num_players=4, repeats=20):
+    """
+    :return: Mean seconds spent building a Game from the pre-game input
+    """
+    data = build_input(size, 0, 0, 0, num_players).encode()
+    hlt.Game(log_level=logging.WARN, reader=FrameReader(io.BytesIO(data)))
+    start = time.perf_counter()
+    for _ in range(repeats):
+        hlt.Game(log_level=logging.WARN, reader=FrameReader(io.BytesIO(data)))
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    # Keep Game from opening a bot log file
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    print("{:>6} {:>8} {:>7} {:>12}".format("size", "deltas", "ships", "usec/turn"))
+    for num_ships in (10, 50):
+        for num_deltas in (0, 50, 200, 800):
+            for size in (32, 48, 64):
+                mean = time_update_frame(size, num_deltas, num_ships)
+                print("{:>6} {:>8} {:>7} {:>12.1f}".format(size, num_deltas, num_ships, mean * 1e6))
+
+    print()
+    print("64x64 initial parse, 4 players: {:.2f} ms".format(time_initial_parse(64) * 1e3))
+    print("64x64 turn, 4 players x 40 ships, 100 deltas: {:.1f} usec".format(
+        time_update_frame(64, 100, 40, num_turns=50, num_players=4) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
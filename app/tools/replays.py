@@ -0,0 +1,288 @@
+"""
+Reads the engine's replay (.hlt) files into compact per-game arrays.
+
+Replays are zstd compressed JSON (decompressing them needs the optional
+zstandard package); uncompressed JSON replays are read as-is. Each replay
+is decoded, converted to flat integer arrays and the JSON dropped, so
+iter_replays can walk hundreds of files holding only one game at a time.
+
+A Replay can also be played back as hlt.Game frames through a
+ReplayReader, so TurnProcessor can be re-run on real game states.
+
+Frame k of a replay is taken to be the state the bots saw on turn k + 1:
+the ships and player energy recorded in that frame, the board with that
+frame's cell changes applied, and the commands the bots answered with.
+
+Usage (from the app directory):
+    python -m tools.replays replays/*.hlt
+"""
+import glob
+import json
+import logging
+import sys
+from array import array
+from collections import namedtuple
+
+import hlt
+from hlt import commands
+from hlt.frames import Frame, PlayerFrame, records
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+_ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+# Command codes in Replay.commands
+COMMAND_CODES = {
+    commands.NORTH: 0,
+    commands.SOUTH: 1,
+    commands.EAST: 2,
+    commands.WEST: 3,
+    commands.STAY_STILL: 4,
+    commands.CONSTRUCT: 5,
+    commands.GENERATE: 6,
+}
+COMMAND_NAMES = {code: name for name, code in COMMAND_CODES.items()}
+
+"""A dropoff built during the game, existing from frame turn onwards."""
+ReplayDropoff = namedtuple('ReplayDropoff', ['turn', 'owner', 'id', 'x', 'y'])
+
+
+def _open(path):
+    """
+    :return: A binary stream of the replay's JSON, decompressed from the file as it is read if need be
+    """
+    replay_file = open(path, 'rb')
+    if not replay_file.peek(len(_ZSTD_MAGIC)).startswith(_ZSTD_MAGIC):
+        return replay_file
+    if zstandard is None:
+        replay_file.close()
+        raise ImportError("Reading compressed replays needs the zstandard package (pip install zstandard)")
+    return zstandard.ZstdDecompressor().stream_reader(replay_file, closefd=True)
+
+
+class Replay:
+    """
+    One game's replay as flat integer arrays.
+
+    Per frame data lives in flat arrays sliced by an offsets array, where
+    frame k covers entries offsets[k] to offsets[k + 1]:
+      cells: (index, halite) records of the cells that changed
+      ships: (owner, id, x, y, cargo) records of every ship
+      commands: (owner, ship id, code) records, ship id -1 for spawns, codes in COMMAND_CODES
+    energy holds num_players entries per frame.
+    """
+    def __init__(self, data, path=None):
+        self.path = path
+        self.constants = data['GAME_CONSTANTS']
+        self.seed = data.get('map_generator_seed')
+        self.num_players = data['number_of_players']
+        self.player_names = [player.get('name') for player in data['players']]
+        self.shipyards = [(player['factory_location']['x'], player['factory_location']['y'])
+                          for player in data['players']]
+
+        production_map = data['production_map']
+        self.width = production_map['width']
+        self.height = production_map['height']
+        self.halite = array('i', [cell['energy'] for row in production_map['grid'] for cell in row])
+
+        self.cells = array('i')
+        self.cell_offsets = array('i', [0])
+        self.ships = array('i')
+        self.ship_offsets = array('i', [0])
+        self.commands = array('i')
+        self.command_offsets = array('i', [0])
+        self.energy = array('i')
+        self.dropoffs = []
+
+        for turn, frame in enumerate(data['full_frames']):
+            self._add_frame(turn, frame)
+
+    @property
+    def turns(self):
+        return len(self.cell_offsets) - 1
+
+    def _add_frame(self, turn, frame):
+        width = self.width
+        for cell in frame.get('cells', ()):
+            self.cells.extend((cell['y'] * width + cell['x'], cell['production']))
+        self.cell_offsets.append(len(self.cells) // 2)
+
+        entities = frame.get('entities', {})
+        for owner in range(self.num_players):
+            for ship_id, ship in sorted(entities.get(str(owner), {}).items(), key=lambda item: int(item[0])):
+                self.ships.extend((owner, int(ship_id), ship['x'], ship['y'], ship['energy']))
+        self.ship_offsets.append(len(self.ships) // 5)
+
+        moves = frame.get('moves', {})
+        for owner in range(self.num_players):
+            for move in moves.get(str(owner), ()):
+                if move['type'] == commands.MOVE:
+                    self.commands.extend((owner, move['id'], COMMAND_CODES[move['direction']]))
+                elif move['type'] == commands.CONSTRUCT:
+                    self.commands.extend((owner, move['id'], COMMAND_CODES[commands.CONSTRUCT]))
+                elif move['type'] == commands.GENERATE:
+                    self.commands.extend((owner, -1, COMMAND_CODES[commands.GENERATE]))
+        self.command_offsets.append(len(self.commands) // 3)
+
+        energy = frame.get('energy', {})
+        self.energy.extend(energy.get(str(owner), 0) for owner in range(self.num_players))
+
+        for event in frame.get('events', ()):
+            if event['type'] == 'construct':
+                location = event['location']
+                self.dropoffs.append(ReplayDropoff(turn, event['owner_id'], event['id'],
+                                                   location['x'], location['y']))
+
+    def frame_cells(self, turn):
+        """
+        :return: The (index, halite) records of the cells that changed in a frame
+        """
+        return self.cells[self.cell_offsets[turn] * 2:self.cell_offsets[turn + 1] * 2]
+
+    def frame_ships(self, turn):
+        """
+        :return: The (owner, id, x, y, cargo) records of every ship in a frame
+        """
+        return self.ships[self.ship_offsets[turn] * 5:self.ship_offsets[turn + 1] * 5]
+
+    def frame_commands(self, turn):
+        """
+        :return: The (owner, ship id, code) records of the commands sent in a frame
+        """
+        return self.commands[self.command_offsets[turn] * 3:self.command_offsets[turn + 1] * 3]
+
+    def frame_energy(self, turn):
+        """
+        :return: Every player's energy in a frame
+        """
+        return self.energy[turn * self.num_players:(turn + 1) * self.num_players]
+
+    def halite_grids(self):
+        """
+        Streams the board halite frame by frame. The same array is updated in place and yielded each time.
+        :return: An iterator of (turn, halite array)
+        """
+        halite = array('i', self.halite)
+        for turn in range(self.turns):
+            for index, amount in records(self.frame_cells(turn), 2):
+                halite[index] = amount
+            yield turn, halite
+
+    def player_commands(self, turn, player_id):
+        """
+        :return: The engine command strings a player sent in a frame
+        """
+        player_commands = []
+        for owner, ship_id, code in records(self.frame_commands(turn), 3):
+            if owner != player_id:
+                continue
+            name = COMMAND_NAMES[code]
+            if name == commands.GENERATE:
+                player_commands.append(name)
+            elif name == commands.CONSTRUCT:
+                player_commands.append("{} {}".format(commands.CONSTRUCT, ship_id))
+            else:
+                player_commands.append("{} {} {}".format(commands.MOVE, ship_id, name))
+        return player_commands
+
+
+class ReplayReader:
+    """
+    Stands in for hlt.frames.FrameReader, handing a Game the frames of a replay.
+    """
+    def __init__(self, replay, player_id):
+        self.replay = replay
+        self.player_id = player_id
+        self._turn = 0
+
+    def read_constants(self):
+        return dict(self.replay.constants, map_width=self.replay.width, map_height=self.replay.height)
+
+    def read_header(self):
+        return self.replay.num_players, self.player_id
+
+    def read_players(self, num_players):
+        return [(player, x, y) for player, (x, y) in enumerate(self.replay.shipyards)]
+
+    def read_map(self):
+        return self.replay.width, self.replay.height, array('i', self.replay.halite)
+
+    def read_turn(self, num_players):
+        replay = self.replay
+        turn = self._turn
+        if turn >= replay.turns:
+            logging.shutdown()
+            raise SystemExit(EOFError("End of replay"))
+        self._turn += 1
+
+        width = replay.width
+        cells = array('i')
+        for index, amount in records(replay.frame_cells(turn), 2):
+            cells.extend((index % width, index // width, amount))
+
+        ships = [array('i') for _ in range(num_players)]
+        for owner, ship_id, x, y, cargo in records(replay.frame_ships(turn), 5):
+            ships[owner].extend((ship_id, x, y, cargo))
+
+        dropoffs = [array('i') for _ in range(num_players)]
+        for dropoff in replay.dropoffs:
+            if dropoff.turn <= turn:
+                dropoffs[dropoff.owner].extend((dropoff.id, dropoff.x, dropoff.y))
+
+        energy = replay.frame_energy(turn)
+        players = [PlayerFrame(player, energy[player], ships[player], dropoffs[player])
+                   for player in range(num_players)]
+        return Frame(turn + 1, players, cells)
+
+
+def load_replay(path):
+    """
+    :return: The Replay stored in a .hlt file
+    """
+    with _open(path) as stream:
+        return Replay(json.load(stream), path)
+
+
+def iter_replays(paths):
+    """
+    Loads replays one at a time, so only one game is held in memory.
+    :param paths: Replay file paths
+    :return: An iterator of Replays
+    """
+    for path in paths:
+        try:
+            yield load_replay(path)
+        except (OSError, ValueError, KeyError) as error:
+            logging.warning(f"Skipping replay {path}: {error!r}")
+
+
+def iter_games(replay, player_id, log_level=logging.ERROR):
+    """
+    Plays a replay back through hlt.Game, as seen by one player.
+    :return: An iterator yielding the Game after each update_frame, with the replay frame index
+    """
+    game = hlt.Game(log_level=log_level, reader=ReplayReader(replay, player_id))
+    for turn in range(replay.turns):
+        game.update_frame()
+        yield turn, game
+
+
+def main():
+    # Keep Game from opening a bot log file
+    logging.getLogger().addHandler(logging.NullHandler())
+
+    paths = [path for pattern in sys.argv[1:] for path in glob.glob(pattern)]
+    print("{:<40} {:>7} {:>7} {:>6} {:>7}  {}".format("replay", "size", "players", "turns", "ships", "energy"))
+    for replay in iter_replays(paths):
+        num_ships = len({(owner, ship_id) for owner, ship_id, _, _, _ in records(replay.ships, 5)})
+        print("{:<40} {:>7} {:>7} {:>6} {:>7}  {}".format(
+            replay.path[-40:], "{}x{}".format(replay.width, replay.height), replay.num_players,
+            replay.turns, num_ships, list(replay.frame_energy(replay.turns - 1)) if replay.turns else []))
+
+
+if __name__ == '__main__':
+    main()
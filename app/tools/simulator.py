@@ -0,0 +1,428 @@
+"""
+In-process simulator of the Halite III game rules.
+
+Plays whole games without the halite binary: every bot gets its own
+hlt.Game, fed frames straight from the simulator's arrays, and the
+commands it returns are applied with the engine's rules (mining, move
+cost, collisions, inspiration, spawning and dropoff construction).
+Games are seeded, so results are reproducible.
+
+Usage (from the app directory):
+    python -m tools.simulator --games 20 --size 32 --players 2
+"""
+import argparse
+import logging
+import math
+import random
+import time
+from array import array
+from collections import namedtuple
+
+import hlt
+from hlt import commands
+from hlt.frames import Frame, PlayerFrame
+
+import executors
+
+
+DEFAULT_CONSTANTS = {
+    'NEW_ENTITY_ENERGY_COST': 1000, 'DROPOFF_COST': 4000, 'MAX_ENERGY': 1000, 'MAX_TURNS': 400,
+    'EXTRACT_RATIO': 4, 'MOVE_COST_RATIO': 10, 'INSPIRATION_ENABLED': True, 'INSPIRATION_RADIUS': 4,
+    'INSPIRATION_SHIP_COUNT': 2, 'INSPIRED_EXTRACT_RATIO': 4, 'INSPIRED_BONUS_MULTIPLIER': 2.0,
+    'INSPIRED_MOVE_COST_RATIO': 10, 'INITIAL_ENERGY': 5000, 'MIN_CELL_PRODUCTION': 900,
+    'MAX_CELL_PRODUCTION': 1000, 'PERSISTENCE': 0.7, 'FACTOR_EXP_1': 2.0,
+}
+
+"""The outcome of one simulated game."""
+GameResult = namedtuple('GameResult', ['seed', 'size', 'turns', 'scores', 'ranks', 'errors'])
+
+_MOVES = {
+    commands.NORTH: (0, -1),
+    commands.SOUTH: (0, 1),
+    commands.EAST: (1, 0),
+    commands.WEST: (-1, 0),
+    commands.STAY_STILL: (0, 0),
+}
+
+
+def max_turns(size):
+    """
+    :return: How many turns the engine plays on a map of this size (400 on 32x32 up to 500 on 64x64)
+    """
+    return 400 + (size - 32) * 25 // 8
+
+
+def generate_map(size, num_players, rng, constants=DEFAULT_CONSTANTS):
+    """
+    Generates a symmetric halite map, one tile per player mirrored across the board.
+
+    Value noise summed over octaves with the engine's persistence, shaped by
+    its exponent and scaled so the richest cell holds between the minimum
+    and maximum cell production.
+    :return: The row-major halite array and the (x, y) shipyard of every player
+    """
+    tile_width = size // 2
+    tile_height = size // 2 if num_players == 4 else size
+
+    noise = [0.0] * (tile_width * tile_height)
+    amplitude = 1.0
+    cell_size = max(tile_width, tile_height)
+    while cell_size >= 1:
+        lattice_width = tile_width // cell_size + 2
+        lattice_height = tile_height // cell_size + 2
+        lattice = [rng.random() for _ in range(lattice_width * lattice_height)]
+        for y in range(tile_height):
+            lattice_y, fraction_y = divmod(y / cell_size, 1)
+            lattice_y = int(lattice_y)
+            for x in range(tile_width):
+                lattice_x, fraction_x = divmod(x / cell_size, 1)
+                lattice_x = int(lattice_x)
+                top = lattice_y * lattice_width + lattice_x
+                bottom = top + lattice_width
+                value = (lattice[top] * (1 - fraction_x) + lattice[top + 1] * fraction_x) * (1 - fraction_y) \
+                    + (lattice[bottom] * (1 - fraction_x) + lattice[bottom + 1] * fraction_x) * fraction_y
+                noise[y * tile_width + x] += value * amplitude
+        amplitude *= constants['PERSISTENCE']
+        cell_size //= 2
+
+    noise = [value ** constants['FACTOR_EXP_1'] for value in noise]
+    peak = rng.randint(constants['MIN_CELL_PRODUCTION'], constants['MAX_CELL_PRODUCTION'])
+    scale = peak / max(noise)
+    tile = [int(value * scale) for value in noise]
+
+    halite = array('i', [0]) * (size * size)
+    for y in range(size):
+        tile_y = y if y < tile_height else size - 1 - y
+        for x in range(size):
+            tile_x = x if x < tile_width else size - 1 - x
+            halite[y * size + x] = tile[tile_y * tile_width + tile_x]
+
+    shipyard_x = tile_width // 2
+    shipyard_y = tile_height // 2
+    shipyards = [(shipyard_x, shipyard_y), (size - 1 - shipyard_x, shipyard_y),
+                 (shipyard_x, size - 1 - shipyard_y), (size - 1 - shipyard_x, size - 1 - shipyard_y)]
+    shipyards = shipyards[:num_players]
+    for x, y in shipyards:
+        halite[y * size + x] = 0
+    return halite, shipyards
+
+
+def hlt_alpha_bot(game):
+    """
+    The HonirBot strategy, as a bot for the simulator.
+    :param game: The bot's hlt.Game
+    :return: A callable planning one turn and returning its commands
+    """
+    fleet = executors.hlt_alpha.FleetManager(game)
+
+    def play_turn():
+        return executors.hlt_alpha.TurnProcessor(game, fleet).run()
+
+    return play_turn
+
+
+class SimulatedReader:
+    """
+    Stands in for hlt.frames.FrameReader, handing a bot the simulator's state directly.
+    """
+    def __init__(self, simulation, player_id):
+        self.simulation = simulation
+        self.player_id = player_id
+
+    def read_constants(self):
+        return dict(self.simulation.constants)
+
+    def read_header(self):
+        return self.simulation.num_players, self.player_id
+
+    def read_players(self, num_players):
+        return [(player, x, y) for player, (x, y) in enumerate(self.simulation.shipyards)]
+
+    def read_map(self):
+        size = self.simulation.size
+        # Every bot updates its own copy of the board
+        return size, size, array('i', self.simulation.halite)
+
+    def read_turn(self, num_players):
+        return self.simulation.frame
+
+
+class Simulation:
+    """
+    A single game of Halite III, played in-process.
+
+    Ships live in parallel arrays indexed by ship id: owner, cell index and
+    cargo, with owner -1 once the ship is destroyed.
+    """
+    def __init__(self, bots, size=32, seed=0, constants=None):
+        """
+        :param bots: One factory per player, called with that player's hlt.Game and returning a turn callable
+        :param size: The map width and height
+        :param seed: Seeds the map and the bots' random module
+        :param constants: Overrides for DEFAULT_CONSTANTS
+        """
+        self.constants = dict(DEFAULT_CONSTANTS, MAX_TURNS=max_turns(size), map_width=size, map_height=size)
+        self.constants.update(constants or {})
+        self.size = size
+        self.seed = seed
+        self.num_players = len(bots)
+        self.turn_number = 0
+
+        rng = random.Random(seed)
+        self.halite, self.shipyards = generate_map(size, self.num_players, rng, self.constants)
+        self.shipyard_cells = [y * size + x for x, y in self.shipyards]
+        self.energy = [self.constants['INITIAL_ENERGY']] * self.num_players
+        self.ship_owner = array('i')
+        self.ship_cell = array('i')
+        self.ship_cargo = array('i')
+        self.dropoffs = [[] for _ in range(self.num_players)]
+        self.structure_owner = {cell: player for player, cell in enumerate(self.shipyard_cells)}
+        self.changed_cells = set()
+        self.frame = None
+        self.errors = [None] * self.num_players
+
+        # Manhattan diamond used for inspiration, as (dx, dy) offsets
+        radius = self.constants['INSPIRATION_RADIUS']
+        self._diamond = [(dx, dy) for dy in range(-radius, radius + 1)
+                         for dx in range(-radius + abs(dy), radius - abs(dy) + 1)]
+
+        random.seed(seed)
+        self.games = [hlt.Game(log_level=logging.ERROR, reader=SimulatedReader(self, player))
+                      for player in range(self.num_players)]
+        self.bots = [bot(game) for bot, game in zip(bots, self.games)]
+
+    def run(self):
+        """
+        Plays the game to the end.
+        :return: The GameResult
+        """
+        for _ in range(self.constants['MAX_TURNS']):
+            self.play_turn()
+
+        scores = list(self.energy)
+        order = sorted(range(self.num_players), key=lambda player: -scores[player])
+        ranks = [0] * self.num_players
+        for rank, player in enumerate(order, 1):
+            ranks[player] = rank
+        return GameResult(self.seed, self.size, self.turn_number, scores, ranks, self.errors)
+
+    def play_turn(self):
+        """
+        Sends the current state to every bot and applies the commands they return.
+        """
+        self.turn_number += 1
+        self.frame = self._build_frame()
+        self.changed_cells = set()
+
+        orders = []
+        for player, (game, bot) in enumerate(zip(self.games, self.bots)):
+            if self.errors[player] is not None:
+                orders.append([])
+                continue
+            try:
+                game.update_frame()
+                orders.append(bot())
+            except Exception as error:
+                logging.exception(f"Player {player} failed on turn {self.turn_number}")
+                self.errors[player] = "turn {}: {!r}".format(self.turn_number, error)
+                orders.append([])
+
+        self._apply(orders)
+
+    def _build_frame(self):
+        size = self.size
+        players = []
+        for player in range(self.num_players):
+            ships = array('i')
+            for ship_id, owner in enumerate(self.ship_owner):
+                if owner == player:
+                    cell = self.ship_cell[ship_id]
+                    ships.extend((ship_id, cell % size, cell // size, self.ship_cargo[ship_id]))
+            dropoffs = array('i')
+            for dropoff_id, cell in self.dropoffs[player]:
+                dropoffs.extend((dropoff_id, cell % size, cell // size))
+            players.append(PlayerFrame(player, self.energy[player], ships, dropoffs))
+
+        cells = array('i')
+        for cell in sorted(self.changed_cells):
+            cells.extend((cell % size, cell // size, self.halite[cell]))
+        return Frame(self.turn_number, players, cells)
+
+    def _parse(self, player, orders):
+        """
+        :return: The player's spawn flag, constructing ship ids and {ship id: direction} moves
+        """
+        spawn = False
+        constructs = []
+        moves = {}
+        commanded = set()
+        for order in orders:
+            parts = order.split()
+            try:
+                if parts[0] == commands.GENERATE and len(parts) == 1:
+                    spawn = True
+                    continue
+                ship_id = int(parts[1])
+                if ship_id in commanded or ship_id >= len(self.ship_owner) or self.ship_owner[ship_id] != player:
+                    raise ValueError("not a ship of this player, or already commanded")
+                commanded.add(ship_id)
+                if parts[0] == commands.CONSTRUCT and len(parts) == 2:
+                    constructs.append(ship_id)
+                elif parts[0] == commands.MOVE and len(parts) == 3 and parts[2] in _MOVES:
+                    moves[ship_id] = parts[2]
+                else:
+                    raise ValueError("unknown command")
+            except (IndexError, ValueError) as error:
+                logging.warning(f"Player {player} sent invalid command {order!r}: {error}")
+        return spawn, constructs, moves
+
+    def _apply(self, orders):
+        size = self.size
+        constants = self.constants
+        halite = self.halite
+        parsed = [self._parse(player, player_orders) for player, player_orders in enumerate(orders)]
+
+        # Dropoff construction
+        for player, (_, constructs, _) in enumerate(parsed):
+            for ship_id in constructs:
+                cell = self.ship_cell[ship_id]
+                cost = constants['DROPOFF_COST'] - self.ship_cargo[ship_id] - halite[cell]
+                if cell in self.structure_owner or self.energy[player] < cost:
+                    continue
+                self.energy[player] -= cost
+                self.dropoffs[player].append((len(self.structure_owner), cell))
+                self.structure_owner[cell] = player
+                self._set_halite(cell, 0)
+                self.ship_owner[ship_id] = -1
+
+        # Spawning
+        for player, (spawn, _, _) in enumerate(parsed):
+            if spawn and self.energy[player] >= constants['NEW_ENTITY_ENERGY_COST']:
+                self.energy[player] -= constants['NEW_ENTITY_ENERGY_COST']
+                self.ship_owner.append(player)
+                self.ship_cell.append(self.shipyard_cells[player])
+                self.ship_cargo.append(0)
+
+        inspired = self._inspired()
+
+        # Movement, paying the move cost from cargo; ships that can't pay stay put
+        moved = set()
+        for player, (_, _, moves) in enumerate(parsed):
+            for ship_id, move in moves.items():
+                if self.ship_owner[ship_id] < 0 or move == commands.STAY_STILL:
+                    continue
+                cell = self.ship_cell[ship_id]
+                ratio = constants['INSPIRED_MOVE_COST_RATIO'] if ship_id in inspired else constants['MOVE_COST_RATIO']
+                cost = halite[cell] // ratio
+                if self.ship_cargo[ship_id] < cost:
+                    continue
+                self.ship_cargo[ship_id] -= cost
+                dx, dy = _MOVES[move]
+                self.ship_cell[ship_id] = ((cell // size + dy) % size) * size + (cell % size + dx) % size
+                moved.add(ship_id)
+
+        # Collisions destroy every ship involved, dropping their cargo
+        occupants = {}
+        for ship_id, owner in enumerate(self.ship_owner):
+            if owner >= 0:
+                occupants.setdefault(self.ship_cell[ship_id], []).append(ship_id)
+        for cell, ship_ids in occupants.items():
+            if len(ship_ids) < 2:
+                continue
+            cargo = sum(self.ship_cargo[ship_id] for ship_id in ship_ids)
+            for ship_id in ship_ids:
+                self.ship_owner[ship_id] = -1
+            if cell in self.structure_owner:
+                self.energy[self.structure_owner[cell]] += cargo
+            else:
+                self._set_halite(cell, halite[cell] + cargo)
+
+        inspired = self._inspired()
+
+        # Mining by ships that didn't move, then deposits on friendly structures
+        max_cargo = constants['MAX_ENERGY']
+        for ship_id, owner in enumerate(self.ship_owner):
+            if owner < 0:
+                continue
+            cell = self.ship_cell[ship_id]
+            if ship_id not in moved and halite[cell] > 0:
+                ratio = constants['INSPIRED_EXTRACT_RATIO'] if ship_id in inspired else constants['EXTRACT_RATIO']
+                extracted = min(math.ceil(halite[cell] / ratio), max_cargo - self.ship_cargo[ship_id])
+                self._set_halite(cell, halite[cell] - extracted)
+                self.ship_cargo[ship_id] += extracted
+                if ship_id in inspired:
+                    bonus = int(extracted * constants['INSPIRED_BONUS_MULTIPLIER'])
+                    self.ship_cargo[ship_id] = min(max_cargo, self.ship_cargo[ship_id] + bonus)
+            if self.structure_owner.get(cell) == owner:
+                self.energy[owner] += self.ship_cargo[ship_id]
+                self.ship_cargo[ship_id] = 0
+
+    def _set_halite(self, cell, amount):
+        self.halite[cell] = amount
+        self.changed_cells.add(cell)
+
+    def _inspired(self):
+        """
+        :return: The ids of ships with enough enemy ships within the inspiration radius
+        """
+        if not self.constants['INSPIRATION_ENABLED']:
+            return set()
+
+        size = self.size
+        counts = [{} for _ in range(self.num_players)]
+        for ship_id, owner in enumerate(self.ship_owner):
+            if owner < 0:
+                continue
+            cell = self.ship_cell[ship_id]
+            x = cell % size
+            y = cell // size
+            owner_counts = counts[owner]
+            for dx, dy in self._diamond:
+                nearby = ((y + dy) % size) * size + (x + dx) % size
+                owner_counts[nearby] = owner_counts.get(nearby, 0) + 1
+
+        threshold = self.constants['INSPIRATION_SHIP_COUNT']
+        inspired = set()
+        for ship_id, owner in enumerate(self.ship_owner):
+            if owner < 0:
+                continue
+            cell = self.ship_cell[ship_id]
+            enemies = sum(player_counts.get(cell, 0) for player, player_counts in enumerate(counts) if player != owner)
+            if enemies >= threshold:
+                inspired.add(ship_id)
+        return inspired
+
+
+def run_game(bots, size=32, seed=0, constants=None):
+    """
+    Plays one seeded game.
+    :return: The GameResult
+    """
+    return Simulation(bots, size, seed, constants).run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded Halite III games in-process")
+    parser.add_argument('--games', type=int, default=10)
+    parser.add_argument('--size', type=int, default=32)
+    parser.add_argument('--players', type=int, choices=(2, 4), default=2)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game, later games count up")
+    args = parser.parse_args()
+
+    # Keep the bots' Game objects from opening log files
+    logging.getLogger().addHandler(logging.NullHandler())
+    logging.getLogger().setLevel(logging.ERROR)
+
+    bots = [hlt_alpha_bot] * args.players
+    start = time.perf_counter()
+    for seed in range(args.seed, args.seed + args.games):
+        result = run_game(bots, args.size, seed)
+        print("seed {:>6}  scores {}  ranks {}{}".format(
+            result.seed, result.scores, result.ranks,
+            "  errors {}".format(result.errors) if any(result.errors) else ""))
+    elapsed = time.perf_counter() - start
+    print("{} games in {:.1f}s ({:.0f} games/hour)".format(args.games, elapsed, args.games / elapsed * 3600))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+"""
+Plays seeded games between bots in parallel with the bundled halite engine.
+
+Games are spread over a process pool, one engine per worker, cycling
+through map sizes and 2 and 4 player games, with every bot taking every
+seat in turn. The engine runs without replays or logs, and bots are told
+not to write bot logs either (HALITE_NO_BOT_LOG). Bots built on hlt.timing
+record per-turn timings into a scratch directory (HALITE_TIMING_DIR), which
+are read back as per-turn latencies.
+
+Results are aggregated per bot into one table: mean rank, win rate and
+mean score with 95% confidence intervals, timeouts and latency percentiles.
+
+Usage (from the app directory):
+    python -m tools.tournament "python3 HonirBot.py" "python3 MyBot.py" --games 64
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from hlt.networking import NO_LOG_VARIABLE
+from hlt.timing import ENVIRONMENT_VARIABLE as TIMING_VARIABLE, percentile
+
+
+APP_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HALITE = os.path.join(APP_DIRECTORY, "halite")
+
+MAP_SIZES = (32, 40, 48, 56, 64)
+PLAYER_COUNTS = (2, 4)
+
+# Spans covering a whole bot turn, from reading the frame to sending the commands
+TURN_SPANS = ("Game.update_frame", "TurnProcessor.run")
+
+# A whole game taking longer than this is killed and counted as an error
+GAME_TIMEOUT = 30 * 60
+
+# z for two sided 95% confidence intervals
+Z_95 = 1.96
+
+"""One game: seats lists the index of the bot in each player slot."""
+Match = namedtuple('Match', ['seed', 'size', 'seats'])
+
+"""How one seat did: latencies are the bot's per-turn times in seconds, empty if it doesn't record timings."""
+SeatResult = namedtuple('SeatResult', ['bot', 'player', 'rank', 'score', 'timed_out', 'latencies'])
+
+"""The outcome of a Match, error holding why the game failed, if it did."""
+MatchResult = namedtuple('MatchResult', ['match', 'seats', 'duration', 'error'])
+
+
+def schedule(num_bots, num_games, seed=0, sizes=MAP_SIZES, player_counts=PLAYER_COUNTS):
+    """
+    Plans a tournament, cycling through map sizes and player counts and rotating the bots through the seats.
+
+    The seating rotates once per cycle through every (size, player count)
+    configuration, so over num_bots cycles every bot takes every seat in
+    each configuration.
+    :param num_bots: How many bots take part
+    :param num_games: How many games to play
+    :param seed: The map seed of the first game, later games count up
+    :return: A list of Matches
+    """
+    configurations = len(sizes) * len(player_counts)
+    matches = []
+    for game in range(num_games):
+        size = sizes[game % len(sizes)]
+        num_players = player_counts[(game // len(sizes)) % len(player_counts)]
+        rotation = game // configurations
+        seats = tuple((rotation + seat) % num_bots for seat in range(num_players))
+        matches.append(Match(seed + game, size, seats))
+    return matches
+
+
+def _read_latencies(directory, player):
+    # Per-turn latencies from the timing files a player's bot wrote, see hlt.timing
+    latencies = []
+    for path in glob.glob(os.path.join(directory, "timing-bot-{}-*.jsonl".format(player))):
+        with open(path) as timing_file:
+            for line in timing_file:
+                turn = json.loads(line)
+                # Skip the startup (turn 0) and summary lines
+                if not turn.get("turn"):
+                    continue
+                micros = sum(duration for name, duration in turn["spans"] if name in TURN_SPANS)
+                latencies.append(micros / 1e6)
+    return latencies
+
+
+def play(match, commands, halite=HALITE):
+    """
+    Plays one game with the engine.
+    :param match: The Match to play
+    :param commands: The command line of each bot
+    :param halite: The engine executable
+    :return: A MatchResult
+    """
+    scratch = tempfile.mkdtemp(prefix="halite-tournament-")
+    environment = dict(os.environ)
+    environment[NO_LOG_VARIABLE] = "1"
+    environment[TIMING_VARIABLE] = scratch
+
+    arguments = [halite, "--results-as-json", "--no-replay", "--no-logs",
+                 "--seed", str(match.seed), "--width", str(match.size), "--height", str(match.size)]
+    arguments += [commands[bot] for bot in match.seats]
+
+    started = time.perf_counter()
+    try:
+        completed = subprocess.run(arguments, cwd=APP_DIRECTORY, env=environment, stdout=subprocess.PIPE,
+                                   stderr=subprocess.DEVNULL, timeout=GAME_TIMEOUT, check=True)
+        results = json.loads(completed.stdout.decode())
+        terminated = results.get("terminated", {})
+        seats = []
+        for player, bot in enumerate(match.seats):
+            stats = results["stats"][str(player)]
+            seats.append(SeatResult(bot, player, stats["rank"], stats["score"],
+                                    bool(terminated.get(str(player))), _read_latencies(scratch, player)))
+        return MatchResult(match, seats, time.perf_counter() - started, None)
+    except (OSError, subprocess.SubprocessError, ValueError, KeyError) as error:
+        return MatchResult(match, [], time.perf_counter() - started, repr(error))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def run_tournament(commands, matches, workers=None, halite=HALITE, progress=None):
+    """
+    Plays every match over a process pool.
+    :param commands: The command line of each bot
+    :param matches: The Matches to play
+    :param workers: How many games to run at once, by default enough to keep every core busy
+    :param progress: Called with each MatchResult as it finishes
+    :return: A list of MatchResults, in match order
+    """
+    if workers is None:
+        # Every game runs an engine and 2 to 4 bots, though the bots mostly take turns
+        workers = max(1, (os.cpu_count() or 1) // 2)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(play, match, commands, halite): match for match in matches}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if progress is not None:
+                progress(result)
+    return [results[match] for match in matches]
+
+
+def mean_interval(values):
+    """
+    :return: The mean of values and the half width of its 95% confidence interval (normal approximation)
+    """
+    if not values:
+        return float('nan'), float('nan')
+    mean = sum(values) / len(values)
+    if len(values) < 2:
+        return mean, float('nan')
+    variance = sum((value - mean) ** 2 for value in values) / (len(values) - 1)
+    return mean, Z_95 * math.sqrt(variance / len(values))
+
+
+def wilson_interval(successes, trials):
+    """
+    :return: The (low, high) 95% Wilson score interval of a proportion
+    """
+    if not trials:
+        return float('nan'), float('nan')
+    proportion = successes / trials
+    denominator = 1 + Z_95 ** 2 / trials
+    centre = (proportion + Z_95 ** 2 / (2 * trials)) / denominator
+    spread = Z_95 * math.sqrt(proportion * (1 - proportion) / trials + Z_95 ** 2 / (4 * trials ** 2)) / denominator
+    return centre - spread, centre + spread
+
+
+def summarise(commands, results):
+    """
+    Aggregates results per bot and player count, plus an "all" row per bot.
+    :return: A list of row dicts, in bot order
+    """
+    rows = []
+    for bot, command in enumerate(commands):
+        for players in sorted({len(result.match.seats) for result in results}) + ["all"]:
+            seats = [seat for result in results if players == "all" or len(result.match.seats) == players
+                     for seat in result.seats if seat.bot == bot]
+            if not seats:
+                continue
+            wins = sum(seat.rank == 1 for seat in seats)
+            latencies = sorted(latency for seat in seats for latency in seat.latencies)
+            rows.append({
+                "bot": command,
+                "players": players,
+                "games": len(seats),
+                "rank": mean_interval([seat.rank for seat in seats]),
+                "wins": wins,
+                "win_rate": wilson_interval(wins, len(seats)),
+                "score": mean_interval([seat.score for seat in seats]),
+                "timeouts": sum(seat.timed_out for seat in seats),
+                "p50_ms": percentile(latencies, 0.50) * 1e3,
+                "p99_ms": percentile(latencies, 0.99) * 1e3,
+                "max_ms": latencies[-1] * 1e3 if latencies else float('nan'),
+            })
+    return rows
+
+
+def format_table(rows):
+    """
+    :return: The summary rows as a text table
+    """
+    lines = ["{:<28} {:>7} {:>5} {:>13} {:>5} {:>15} {:>17} {:>8} {:>8} {:>8} {:>8}".format(
+        "bot", "players", "games", "mean rank", "wins", "win rate 95%", "mean score", "timeouts",
+        "p50 ms", "p99 ms", "max ms")]
+    for row in rows:
+        rank, rank_interval = row["rank"]
+        low, high = row["win_rate"]
+        score, score_interval = row["score"]
+        lines.append("{:<28} {:>7} {:>5} {:>13} {:>5} {:>15} {:>17} {:>8} {:>8.1f} {:>8.1f} {:>8.1f}".format(
+            row["bot"][-28:], row["players"], row["games"],
+            "{:.2f} ±{:.2f}".format(rank, rank_interval), row["wins"],
+            "{:.0%}-{:.0%}".format(low, high),
+            "{:.0f} ±{:.0f}".format(score, score_interval), row["timeouts"],
+            row["p50_ms"], row["p99_ms"], row["max_ms"]))
+    return "\n".join(lines)
+
+
+def _parse_sizes(text):
+    sizes = tuple(int(size) for size in re.split(r"[, ]+", text.strip()) if size)
+    if not sizes or any(size < 32 or size > 64 for size in sizes):
+        raise argparse.ArgumentTypeError("map sizes must be between 32 and 64")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play seeded games between bots in parallel with the halite engine")
+    parser.add_argument('commands', nargs='+', help='bot command lines, e.g. "python3 HonirBot.py"')
+    parser.add_argument('--games', type=int, default=64)
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game, later games count up")
+    parser.add_argument('--sizes', type=_parse_sizes, default=MAP_SIZES, help="comma separated map sizes")
+    parser.add_argument('--players', type=int, choices=PLAYER_COUNTS, nargs='+', default=PLAYER_COUNTS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--halite', default=HALITE, help="the engine executable")
+    parser.add_argument('--json', help="also write every game's results to this file")
+    args = parser.parse_args()
+
+    matches = schedule(len(args.commands), args.games, args.seed, args.sizes, args.players)
+
+    def progress(result):
+        outcome = result.error or " ".join("{}:{}".format(seat.bot, seat.score) for seat in result.seats)
+        print("seed {:>6} {:>2}x{:<2} {}p  {:>6.1f}s  {}".format(
+            result.match.seed, result.match.size, result.match.size, len(result.match.seats),
+            result.duration, outcome), flush=True)
+
+    start = time.perf_counter()
+    results = run_tournament(args.commands, matches, args.workers, args.halite, progress)
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(format_table(summarise(args.commands, results)))
+    errors = sum(result.error is not None for result in results)
+    print("{} games in {:.0f}s, {} failed".format(len(results), elapsed, errors))
+
+    if args.json:
+        with open(args.json, "w") as json_file:
+            json.dump([{"seed": result.match.seed, "size": result.match.size, "seats": result.match.seats,
+                        "duration": result.duration, "error": result.error,
+                        "results": [seat._asdict() for seat in result.seats]} for result in results],
+                      json_file)
+
+
+if __name__ == '__main__':
+    main()